@@ -1,9 +1,12 @@
+import axios from 'axios';
 import { Application } from "../models/application.model.js";
 import { Job } from "../models/job.model.js";
 
 import getDataUri from "../utils/datauri.js";
 import cloudinary from "../utils/cloudinary.js";
 
+const ML_SERVICE_URL = process.env.ML_SERVICE_URL || 'http://localhost:5000';
+
 export const applyJob = async (req, res) => {
     try {
         const userId = req.id;
@@ -89,6 +92,25 @@ export const applyJob = async (req, res) => {
         job.applications.push(newApplication._id);
         await job.save();
 
+        // Precompute resume features so ranking doesn't download the PDF again.
+        // Fire and forget: a failure here must not fail the submission
+        axios.post(`${ML_SERVICE_URL}/ingest`, {
+            applications: [{
+                id: newApplication._id.toString(),
+                fullname: newApplication.fullname,
+                email: newApplication.email,
+                phoneNumber: newApplication.phoneNumber,
+                resumeFileUrl: newApplication.resumeFileUrl,
+                coverLetter: newApplication.coverLetter,
+                status: newApplication.status,
+                createdAt: newApplication.createdAt
+            }]
+        }, {
+            timeout: 60000
+        }).catch(error => {
+            console.log('ML service ingest failed:', error.message);
+        });
+
         return res.status(201).json({
             message: "Job application submitted successfully.",
             success: true,
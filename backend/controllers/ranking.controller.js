@@ -52,7 +52,8 @@ export const rankApplications = async (req, res) => {
         // Call Python ML service
         const mlResponse = await axios.post(`${ML_SERVICE_URL}/rank`, {
             applications: applicationsForRanking,
-            job_description: jobDescription
+            job_description: jobDescription,
+            job_id: jobId
         }, {
             timeout: 60000 // 60 second timeout
         });
@@ -0,0 +1,81 @@
+"""
+Dense float64 vs sparse float32 feature preparation
+Run from ml-service/: python -m benchmarks.bench_feature_pipeline
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from ml_service import ResumeRanker
+
+
+def dense_features(ranker, resume_texts, job_description):
+    """The previous pipeline: densify the full vocabulary, then slice"""
+    features = np.zeros((len(resume_texts), ranker.num_features))
+    combined_texts = [f"{resume} {job_description}" for resume in resume_texts]
+    tfidf_features = ranker.vectorizer.transform(combined_texts).toarray()
+    feature_count = min(tfidf_features.shape[1], ranker.num_features)
+    features[:, :feature_count] = tfidf_features[:, :feature_count]
+    return features
+
+
+def sparse_features(ranker, resume_texts, job_description):
+    return ranker.prepare_features(resume_texts, job_description)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def synthetic_resumes(vocabulary, n, words_per_resume, seed=0):
+    rng = random.Random(seed)
+    filler = ['lorem', 'ipsum', 'dolor', 'sit', 'amet']
+    pool = list(vocabulary) + filler
+    return [" ".join(rng.choices(pool, k=words_per_resume)) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='lightgbm_ranking.txt')
+    parser.add_argument('--vectorizer', default='ranking.pkl')
+    parser.add_argument('--applicants', type=int, default=10000)
+    parser.add_argument('--words', type=int, default=600, help='words per synthetic resume')
+    args = parser.parse_args()
+
+    ranker = ResumeRanker(model_path=args.model, vectorizer_path=args.vectorizer,
+                          prune_vectorizer=False)
+    vocabulary = getattr(ranker.vectorizer, 'vocabulary_', {})
+    resumes = synthetic_resumes(vocabulary, args.applicants, args.words)
+    job_description = synthetic_resumes(vocabulary, 1, 400, seed=1)[0]
+
+    print(f"\n{args.applicants} applicants, {args.words} words each, "
+          f"vocabulary {len(vocabulary)}, {ranker.num_features} model features")
+    print("-" * 70)
+
+    dense, dense_time, dense_peak = measure(dense_features, ranker, resumes, job_description)
+    sparse, sparse_time, sparse_peak = measure(sparse_features, ranker, resumes, job_description)
+
+    _, dense_predict, _ = measure(ranker.model.predict, dense)
+    _, sparse_predict, _ = measure(ranker.model.predict, sparse)
+
+    max_diff = np.abs(dense - sparse.toarray()).max() if dense.size else 0.0
+
+    print(f"{'path':8s} {'features (s)':>14s} {'predict (s)':>12s} {'peak memory (MB)':>18s}")
+    print(f"{'dense':8s} {dense_time:14.3f} {dense_predict:12.3f} {dense_peak / 2**20:18.1f}")
+    print(f"{'sparse':8s} {sparse_time:14.3f} {sparse_predict:12.3f} {sparse_peak / 2**20:18.1f}")
+    print("-" * 70)
+    print(f"max |dense - sparse| = {max_diff:.2e} (float32 rounding)")
+
+
+if __name__ == "__main__":
+    main()
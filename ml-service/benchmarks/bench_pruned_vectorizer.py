@@ -0,0 +1,46 @@
+"""
+Full sklearn vectorizer vs PrunedVectorizer on long resumes
+Run from ml-service/: python -m benchmarks.bench_pruned_vectorizer
+"""
+
+import argparse
+import pickle
+
+from pruned_vectorizer import PrunedVectorizer
+from benchmarks.bench_feature_pipeline import measure, synthetic_resumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vectorizer', default='ranking.pkl')
+    parser.add_argument('--num-features', type=int, default=386)
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--words', type=int, default=5000, help='words per synthetic resume')
+    args = parser.parse_args()
+
+    with open(args.vectorizer, 'rb') as f:
+        vectorizer = pickle.load(f)
+    if not PrunedVectorizer.supports(vectorizer):
+        parser.error("this vectorizer cannot be pruned (custom tokenizer, n-grams, ...)")
+
+    pruned = PrunedVectorizer(vectorizer, args.num_features)
+    resumes = synthetic_resumes(vectorizer.vocabulary_, args.resumes, args.words)
+
+    full, full_time, full_peak = measure(vectorizer.transform, resumes)
+    fast, fast_time, fast_peak = measure(pruned.transform, resumes)
+    n = args.num_features
+    mismatches = (full[:, :n] != fast[:, :n]).nnz
+
+    print(f"\n{args.resumes} resumes, {args.words} words each, vocabulary "
+          f"{len(vectorizer.vocabulary_)}, {len(pruned.columns)} terms matched "
+          f"({'pruned' if pruned.pruned else 'norm needs every term'})")
+    print("-" * 60)
+    print(f"{'vectorizer':10s} {'time (s)':>10s} {'peak memory (MB)':>18s}")
+    print(f"{'sklearn':10s} {full_time:10.3f} {full_peak / 2**20:18.1f}")
+    print(f"{'pruned':10s} {fast_time:10.3f} {fast_peak / 2**20:18.1f}")
+    print("-" * 60)
+    print(f"{full_time / fast_time:.1f}x faster, {mismatches} differing values in the model's columns")
+
+
+if __name__ == "__main__":
+    main()
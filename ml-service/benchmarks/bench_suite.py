@@ -0,0 +1,183 @@
+"""
+Microbenchmarks for every ml-service hot path, on synthetic offline fixtures
+Run from ml-service/:
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --baseline bench.json   # exits 1 on regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks import fixtures
+
+
+def timed(fn, repeat, number=1):
+    """Per-call times in milliseconds: `repeat` samples of `number` calls each"""
+    fn()  # warm-up, not measured
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        'best_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'repeat': repeat,
+        'number': number
+    }
+
+
+def repeats_for(size, repeat):
+    """Fewer samples for the big sizes so a full run stays in minutes"""
+    return max(3, repeat // max(1, size // 100))
+
+
+def bench_extraction(args, results):
+    from pdf_extractor import PDFTextExtractor
+
+    for pages in args.pages:
+        content = fixtures.resume_pdf(pages, args.words_per_page)
+        results[f"extract_from_file/pages={pages}"] = timed(
+            lambda: PDFTextExtractor.extract_from_file(BytesIO(content)), args.repeat
+        )
+
+    for words in args.resume_words:
+        text = fixtures.resume_text(words)
+        results[f"clean_text/words={words}"] = timed(
+            lambda: PDFTextExtractor.clean_text(text), args.repeat, number=10
+        )
+        cleaned = PDFTextExtractor.clean_text(text)
+        results[f"extract_key_sections/words={words}"] = timed(
+            lambda: PDFTextExtractor.extract_key_sections(cleaned), args.repeat, number=10
+        )
+
+
+def bench_ranking(args, results, model_path, vectorizer_path):
+    from ml_service import ResumeRanker
+
+    ranker = ResumeRanker(model_path=model_path, vectorizer_path=vectorizer_path,
+                          inference_engine=args.inference_engine)
+    words = args.resume_words[len(args.resume_words) // 2]
+
+    for size in args.sizes:
+        applications = fixtures.applications(size, words)
+        texts = [app['resume_text'] for app in applications]
+        repeat = repeats_for(size, args.repeat)
+
+        results[f"prepare_features/n={size}"] = timed(
+            lambda: ranker.prepare_features(texts, fixtures.JOB_DESCRIPTION), repeat
+        )
+        features = ranker.prepare_features(texts, fixtures.JOB_DESCRIPTION)
+        results[f"booster_predict/n={size}"] = timed(lambda: ranker.model.predict(features), repeat)
+        results[f"rank_applications/n={size}"] = timed(
+            lambda: ranker.rank_applications([dict(app) for app in applications],
+                                             fixtures.JOB_DESCRIPTION),
+            repeat
+        )
+
+
+def environment():
+    versions = {'python': platform.python_version()}
+    for module in ('numpy', 'scipy', 'sklearn', 'lightgbm', 'PyPDF2'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'versions': versions,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    }
+
+
+def compare(results, baseline, threshold):
+    """Benchmarks whose median got slower than baseline by more than `threshold`"""
+    regressions = []
+    print(f"\n{'benchmark':40s} {'baseline (ms)':>14s} {'now (ms)':>12s} {'change':>8s}")
+    print("-" * 78)
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            print(f"{name:40s} {'-':>14s} {result['median_ms']:12.3f} {'new':>8s}")
+            continue
+        change = result['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        flag = ''
+        if change > threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:40s} {before['median_ms']:14.3f} {result['median_ms']:12.3f} {change:+7.1%}{flag}")
+    print("-" * 78)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='lightgbm_ranking.txt')
+    parser.add_argument('--vectorizer', default='ranking.pkl',
+                        help='fitted vectorizer; a synthetic one is fitted if this file is missing')
+    parser.add_argument('--sizes', default='10,100,1000,10000', help='applicants per ranking')
+    parser.add_argument('--pages', default='1,3,10', help='pages per synthetic PDF')
+    parser.add_argument('--words-per-page', type=int, default=400)
+    parser.add_argument('--resume-words', default='200,800,3000', help='words per synthetic resume')
+    parser.add_argument('--inference-engine', default='lightgbm')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', choices=('extraction', 'ranking'))
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='median slowdown (fraction) that counts as a regression')
+    args = parser.parse_args()
+    args.sizes = [int(s) for s in args.sizes.split(',')]
+    args.pages = [int(p) for p in args.pages.split(',')]
+    args.resume_words = [int(w) for w in args.resume_words.split(',')]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        vectorizer_path = args.vectorizer
+        if not os.path.exists(vectorizer_path):
+            print(f"{vectorizer_path} not found, fitting a synthetic vectorizer")
+            vectorizer_path = fixtures.fit_vectorizer(os.path.join(tmp, 'vectorizer.pkl'))
+
+        if args.only != 'ranking':
+            bench_extraction(args, results)
+        if args.only != 'extraction':
+            bench_ranking(args, results, args.model, vectorizer_path)
+
+    print(f"\n{'benchmark':40s} {'best (ms)':>12s} {'median (ms)':>12s}")
+    print("-" * 66)
+    for name, result in results.items():
+        print(f"{name:40s} {result['best_ms']:12.3f} {result['median_ms']:12.3f}")
+
+    report = {
+        'environment': environment(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
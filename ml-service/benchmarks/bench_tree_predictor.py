@@ -0,0 +1,64 @@
+"""
+lgb.Booster.predict vs the NumPy TreeEnsemblePredictor across batch sizes
+Run from ml-service/: python -m benchmarks.bench_tree_predictor
+"""
+
+import argparse
+import time
+
+import lightgbm as lgb
+import numpy as np
+from scipy import sparse
+
+from tree_predictor import TreeEnsemblePredictor
+
+
+def best_time(fn, X, repeat):
+    """Fastest of `repeat` runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='lightgbm_ranking.txt')
+    parser.add_argument('--sizes', default='1,3,10,25,50,100,250,1000,10000')
+    parser.add_argument('--density', type=float, default=0.05, help='non-zero share of tf-idf features')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    booster = lgb.Booster(model_file=args.model)
+    predictor = TreeEnsemblePredictor(args.model)
+    print(f"\n{predictor.num_trees} trees, max depth {predictor.max_depth}, "
+          f"{predictor.num_features} features")
+    print("-" * 70)
+    print(f"{'batch':>7s} {'lightgbm (ms)':>14s} {'numpy (ms)':>12s} {'max |diff|':>12s}  winner")
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    crossover = None
+    for size in sizes:
+        X = sparse.random(size, predictor.num_features, density=args.density,
+                          format='csr', dtype=np.float32, random_state=size)
+        diff = np.abs(booster.predict(X) - predictor.predict(X)).max()
+        lgb_ms = best_time(booster.predict, X, args.repeat)
+        numpy_ms = best_time(predictor.predict, X, args.repeat)
+        winner = 'numpy' if numpy_ms < lgb_ms else 'lightgbm'
+        if winner == 'lightgbm' and crossover is None:
+            crossover = size
+        print(f"{size:7d} {lgb_ms:14.3f} {numpy_ms:12.3f} {diff:12.2e}  {winner}")
+
+    print("-" * 70)
+    if crossover is None:
+        print("NumPy engine won at every batch size tested")
+    elif crossover == sizes[0]:
+        print("LightGBM won from the smallest batch; keep RANKER_INFERENCE_ENGINE=lightgbm")
+    else:
+        print(f"LightGBM wins from batch size {crossover}; set RANKER_NUMPY_MAX_BATCH below it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-worker memory of the ranker: private pickled vectorizer vs SHARED_MODEL_DIR
+Starts N worker processes the way uvicorn --workers does, loads the ranker in
+each and reports their unique (USS) and proportional (PSS) memory. Linux only.
+Run from ml-service/: python -m benchmarks.bench_worker_memory [--synthetic-vocab 200000]
+"""
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import random
+import string
+import tempfile
+import time
+
+from worker_memory import process_memory
+
+
+def load_worker(mode, model_path, vectorizer_path, shared_dir, ready, done):
+    from ml_service import ResumeRanker
+    from shared_model import SharedModelStore
+
+    artifact_cache = SharedModelStore(shared_dir) if mode == 'shared' else None
+    ranker = ResumeRanker(model_path=model_path, vectorizer_path=vectorizer_path,
+                          inference_engine='numpy', artifact_cache=artifact_cache)
+    ranker.warm_up()
+    ready.put(process_memory())
+    done.wait()
+
+
+def synthetic_vectorizer(path, vocabulary_size):
+    """Fit a TfidfVectorizer with roughly `vocabulary_size` random terms"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    rng = random.Random(0)
+    terms = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 14)))
+             for _ in range(vocabulary_size)]
+    docs = [' '.join(terms[i:i + 50]) for i in range(0, len(terms), 50)]
+    with open(path, 'wb') as f:
+        pickle.dump(TfidfVectorizer().fit(docs), f)
+
+
+def measure(mode, workers, model_path, vectorizer_path, shared_dir):
+    ctx = multiprocessing.get_context('spawn')
+    ready, done = ctx.Queue(), ctx.Event()
+    processes = [
+        ctx.Process(target=load_worker,
+                    args=(mode, model_path, vectorizer_path, shared_dir, ready, done))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [ready.get(timeout=300) for _ in processes]
+    done.set()
+    for process in processes:
+        process.join()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='lightgbm_ranking.txt')
+    parser.add_argument('--vectorizer', default='ranking.pkl')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--synthetic-vocab', type=int, default=0,
+                        help='benchmark a generated vectorizer with this many terms instead')
+    args = parser.parse_args()
+
+    if process_memory() is None:
+        parser.error("/proc/self/smaps_rollup is not available on this system")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectorizer_path = args.vectorizer
+        if args.synthetic_vocab:
+            vectorizer_path = os.path.join(tmp, 'synthetic.pkl')
+            synthetic_vectorizer(vectorizer_path, args.synthetic_vocab)
+        shared_dir = os.path.join(tmp, 'shared')
+
+        # Build the shared copy once so the first worker's build isn't measured
+        measure('shared', 1, args.model, vectorizer_path, shared_dir)
+
+        print(f"\n{args.workers} workers, vectorizer {vectorizer_path} "
+              f"({os.path.getsize(vectorizer_path) / 2**20:.1f} MiB pickled)")
+        print("-" * 62)
+        print(f"{'mode':>8s} {'USS/worker':>12s} {'PSS/worker':>12s} {'total PSS':>12s} {'load (s)':>9s}")
+        for mode in ('private', 'shared'):
+            started = time.perf_counter()
+            reports = measure(mode, args.workers, args.model, vectorizer_path, shared_dir)
+            elapsed = time.perf_counter() - started
+            uss = sum(r['uss'] for r in reports) / len(reports) / 2**20
+            pss = sum(r['pss'] for r in reports) / 2**20
+            print(f"{mode:>8s} {uss:10.1f}Mi {pss / len(reports):10.1f}Mi {pss:10.1f}Mi {elapsed:9.2f}")
+        print("-" * 62)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Synthetic, deterministic benchmark inputs: resume texts and multi-page PDFs.
+Everything is generated locally so the benchmarks run offline.
+"""
+
+import pickle
+import random
+
+
+SECTIONS = ('Skills', 'Experience', 'Education', 'Projects')
+
+WORDS = (
+    'python java javascript typescript react node sql postgresql mongodb docker '
+    'kubernetes aws azure gcp machine learning deep nlp pytorch tensorflow pandas '
+    'numpy scikit spark kafka airflow rest api microservices git linux agile scrum '
+    'team lead senior junior developer engineer analyst data science backend '
+    'frontend fullstack testing ci cd cloud security design architecture '
+    'bachelor master university degree computer communication leadership '
+    'managed built deployed improved reduced latency throughput customers product'
+).split()
+
+JOB_DESCRIPTION = (
+    "Looking for a senior Python machine learning engineer with experience in "
+    "deep learning, NLP and deploying models on AWS with Docker and Kubernetes. "
+    "Must be proficient in PyTorch or TensorFlow and SQL."
+)
+
+
+def _word(rng):
+    # One word in five is a rarer term, so the vocabulary has a realistic long tail
+    return rng.choice(WORDS) if rng.random() < 0.8 else f"tool{rng.randrange(5000)}"
+
+
+def resume_text(words, seed=0):
+    """Plain-text resume of roughly `words` words with the usual section headings"""
+    rng = random.Random(seed)
+    per_section = max(1, words // len(SECTIONS))
+    parts = [f"Candidate {seed} - {rng.choice(WORDS)} {rng.choice(WORDS)}"]
+    for heading in SECTIONS:
+        body = ' '.join(_word(rng) for _ in range(per_section))
+        parts.append(f"{heading}: {body}.")
+    return '\n'.join(parts)
+
+
+def resume_texts(n, words, seed=0):
+    return [resume_text(words, seed=seed + i) for i in range(n)]
+
+
+def applications(n, words, seed=0):
+    return [
+        {'id': str(i), 'fullname': f'Applicant {i}', 'resume_text': text}
+        for i, text in enumerate(resume_texts(n, words, seed=seed))
+    ]
+
+
+def _escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def resume_pdf(pages, words_per_page, seed=0):
+    """
+    Minimal valid PDF (Helvetica text, one content stream per page) as bytes,
+    readable by PyPDF2 without any PDF-writing dependency.
+    """
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        words = [_word(rng) for _ in range(words_per_page)]
+        lines = [SECTIONS[page % len(SECTIONS)] + ':'] + \
+            [' '.join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        stream = ["BT /F1 10 Tf 12 TL 50 780 Td"]
+        stream += [f"({_escape(line)}) Tj T*" for line in lines]
+        stream.append("ET")
+        content = '\n'.join(stream).encode('latin-1')
+
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = b' '.join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def fit_vectorizer(path, documents=2000, words=300):
+    """Fit and pickle a TfidfVectorizer on synthetic resumes, for trees without ranking.pkl"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer().fit(resume_texts(documents, words, seed=10_000) + [JOB_DESCRIPTION])
+    with open(path, 'wb') as f:
+        pickle.dump(vectorizer, f)
+    return path
@@ -0,0 +1,250 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def _exclusive_lock(path):
+    """Exclusive lock on a lock file, held across processes"""
+    with open(path, 'a+b') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        else:
+            lock.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after 10 seconds; keep waiting
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+            else:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _Space:
+    """
+    Rows of one term-count column space (one model + vectorizer version).
+
+    Non-zero counts are appended to two flat files, values.f32 (float32)
+    and indices.i32 (int32), read back through read-only memory maps. The
+    SQLite index maps each application id to its slice of those files.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.values_path = os.path.join(directory, 'values.f32')
+        self.indices_path = os.path.join(directory, 'indices.i32')
+        for path in (self.values_path, self.indices_path):
+            open(path, 'ab').close()
+
+        self._lock_path = os.path.join(directory, 'append.lock')
+        self._values = np.empty(0, dtype=np.float32)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._mapped = 0
+
+        self.db = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS rows (
+                id TEXT PRIMARY KEY,
+                source_hash TEXT NOT NULL,
+                text TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                n_columns INTEGER NOT NULL,
+                ingested_at REAL NOT NULL
+            );
+        """)
+
+    def append(self, counts):
+        """
+        Append the rows of a CSR count matrix; returns each row's offset.
+        Serialized across processes with a file lock, so several uvicorn
+        workers can ingest into the same store.
+        """
+        counts = counts.tocsr()
+        counts.sort_indices()
+        with _exclusive_lock(self._lock_path):
+            start = self._aligned_size()
+            with open(self.values_path, 'ab') as f:
+                f.write(np.asarray(counts.data, dtype=np.float32).tobytes())
+            with open(self.indices_path, 'ab') as f:
+                f.write(np.asarray(counts.indices, dtype=np.int32).tobytes())
+        return start + counts.indptr[:-1], np.diff(counts.indptr)
+
+    def _aligned_size(self):
+        """
+        Number of complete entries in both files. A crash between the two
+        writes of an append (before its rows reached the index) leaves the
+        files of different lengths; the extra tail is cut off so the next
+        append starts at the same offset in both.
+        """
+        size = min(os.path.getsize(self.values_path), os.path.getsize(self.indices_path)) // 4
+        for path in (self.values_path, self.indices_path):
+            if os.path.getsize(path) != size * 4:
+                os.truncate(path, size * 4)
+        return size
+
+    def arrays(self, needed):
+        """Memory maps of values and indices covering at least `needed` entries"""
+        if needed > self._mapped:
+            size = min(os.path.getsize(self.values_path), os.path.getsize(self.indices_path)) // 4
+            if size:
+                self._values = np.memmap(self.values_path, dtype=np.float32, mode='r', shape=(size,))
+                self._indices = np.memmap(self.indices_path, dtype=np.int32, mode='r', shape=(size,))
+            self._mapped = size
+        return self._values, self._indices
+
+
+class FeatureStore:
+    """
+    Persistent per-application resume features, written at ingest time.
+
+    For every ingested application the store keeps the extracted resume
+    text and its raw term counts (the part of the ranking features that
+    does not depend on the job). /rank then builds features from stored
+    rows plus the job description's counts, without downloading or parsing
+    the PDF. Counts are kept per `version` (see ResumeRanker.counts_version),
+    so rows written for another model or vectorizer are never mixed in.
+
+    A row is only used while the application's resume URL and cover letter
+    are the ones it was ingested with (source_hash). Re-ingesting an id
+    appends a new row; the old bytes stay in the files until they are
+    rebuilt.
+    """
+
+    VERSION_PATTERN = re.compile(r'^[A-Za-z0-9._-]+$')
+    QUERY_CHUNK = 500
+
+    def __init__(self, directory='.feature_store'):
+        """
+        Args:
+            directory: Root directory; one subdirectory per counts version
+        """
+        self.directory = directory
+        self._spaces = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'ingested': 0}
+
+    @staticmethod
+    def source_hash(app_data):
+        """Identifies the inputs of an application's resume text"""
+        source = f"{app_data.get('resumeFileUrl') or ''}\0{app_data.get('coverLetter') or ''}"
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def _space(self, version):
+        if not self.VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid feature store version {version!r}")
+        space = self._spaces.get(version)
+        if space is None:
+            space = self._spaces[version] = _Space(os.path.join(self.directory, version))
+        return space
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def get_many(self, version, applications):
+        """
+        Stored rows for a list of application dicts
+
+        Returns:
+            list aligned with `applications`: (text, 1 x n_columns CSR counts)
+            for ingested, unchanged applications, None for the others
+        """
+        ids = [app_data.get('id') for app_data in applications]
+        found = {}
+        with self._lock:
+            space = self._space(version)
+            unique_ids = list(dict.fromkeys(i for i in ids if i is not None))
+            for start in range(0, len(unique_ids), self.QUERY_CHUNK):
+                chunk = unique_ids[start:start + self.QUERY_CHUNK]
+                rows = space.db.execute(
+                    "SELECT id, source_hash, text, offset, length, n_columns FROM rows "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                found.update((row[0], row[1:]) for row in rows)
+            needed = max((offset + length for _, _, offset, length, _ in found.values()), default=0)
+            values, indices = space.arrays(needed)
+
+            results = []
+            for app_data, app_id in zip(applications, ids):
+                row = found.get(app_id)
+                if row is None:
+                    self._stats['misses'] += 1
+                    results.append(None)
+                    continue
+                source_hash, text, offset, length, n_columns = row
+                if source_hash != self.source_hash(app_data):
+                    self._stats['stale'] += 1
+                    results.append(None)
+                    continue
+                counts = sparse.csr_matrix(
+                    (np.array(values[offset:offset + length]),
+                     np.array(indices[offset:offset + length]),
+                     np.array([0, length])),
+                    shape=(1, n_columns)
+                )
+                self._stats['hits'] += 1
+                results.append((text, counts))
+        return results
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def put_many(self, version, applications, texts, counts):
+        """
+        Store texts and term counts (CSR, one row per application)
+
+        Args:
+            version: Counts version of the ranker that computed them
+            applications: Application dicts (id, resumeFileUrl, coverLetter)
+            texts: Resume text of each application
+            counts: Term counts of each text
+        """
+        if not applications:
+            return
+        now = time.time()
+        with self._lock:
+            space = self._space(version)
+            offsets, lengths = space.append(counts)
+            space.db.executemany(
+                "INSERT OR REPLACE INTO rows (id, source_hash, text, offset, length, n_columns, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (app_data['id'], self.source_hash(app_data), text, int(offset), int(length),
+                     counts.shape[1], now)
+                    for app_data, text, offset, length in zip(applications, texts, offsets, lengths)
+                ]
+            )
+            space.db.commit()
+            self._stats['ingested'] += len(applications)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['versions'] = {
+                version: space.db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+                for version, space in self._spaces.items()
+            }
+        return stats
@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from request_profiler import current_profile
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor cannot accept more work"""
+
+
+class InferenceExecutor:
+    """
+    Dedicated, bounded executor for ResumeRanker calls.
+
+    Vectorization and Booster.predict run on these threads instead of the
+    event loop, so /health and I/O keep being served while a large job is
+    scored. At most `workers` calls run at once and at most `max_queue`
+    wait; anything beyond that is rejected immediately.
+    """
+
+    def __init__(self, workers=2, max_queue=8):
+        """
+        Args:
+            workers: Number of inference threads
+            max_queue: Calls allowed to wait for a free thread
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        self._active = 0
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on an inference thread
+
+        Raises:
+            InferenceQueueFull: if workers and queue are all taken
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFull(
+                    f"Inference queue full ({self._pending} calls pending)"
+                )
+            self._pending += 1
+
+        # Carry context variables (e.g. the request's profile) to the thread
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, self._call, fn, args, kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the call really ends: a cancelled caller (e.g. a
+        # client disconnect) does not stop a call that is already running
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self._active += 1
+        try:
+            profile = current_profile.get()
+            if profile is not None:
+                return profile.call(fn, *args, **kwargs)
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def stats(self):
+        with self._lock:
+            queued = self._pending - self._active
+            capacity = self.workers + self.max_queue
+            return {
+                'workers': self.workers,
+                'active': self._active,
+                'queued': max(queued, 0),
+                'max_queue': self.max_queue,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'saturation': round(self._pending / capacity, 4) if capacity else 1.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
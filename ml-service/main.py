@@ -1,13 +1,140 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from contextlib import asynccontextmanager
+import asyncio
+import hmac
+import json
+import logging
+import os
+import time
 import uvicorn
 
-# Import our custom modules
-from ml_service import ResumeRanker
-from pdf_extractor import PDFTextExtractor
+# Import our custom modules (the ML stack itself is imported by load_ranker;
+# modules pulling in numpy, scipy or httpx are imported by lifespan)
+from ranking_state import RankingStateStore
+from pdf_extractor import ExtractionLimits, PDFTextExtractor
+from pdf_parse_pool import PDFParsePool
+from section_scanner import DEFAULT_SCANNER, SectionScanner
+from resume_cache import ResumeTextCache
+from inference_executor import InferenceExecutor, InferenceQueueFull
+from model_watcher import ModelFileWatcher
+from worker_memory import process_memory
+import service_metrics as metrics
+from service_logging import PER_RESUME, RequestIdMiddleware, configure_logging, dropped_records, request_id
+from request_profiler import ProfileStore, ProfilingMiddleware
+
+MODEL_PATH = os.getenv("MODEL_PATH", "lightgbm_ranking.txt")
+VECTORIZER_PATH = os.getenv("VECTORIZER_PATH", "ranking.pkl")
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+
+def optional_limit(name, default, cast=int):
+    """Numeric limit from the environment; 0 or empty means unlimited"""
+    value = cast(os.getenv(name, str(default)) or 0)
+    return value if value > 0 else None
+
+
+# Applied to every resume; a request can only narrow them
+EXTRACTION_LIMITS = ExtractionLimits(
+    max_pages=optional_limit("PDF_MAX_PAGES", 30),
+    max_chars=optional_limit("PDF_MAX_CHARS", 200_000),
+    max_seconds=optional_limit("PDF_MAX_SECONDS", 10, float)
+)
+
+
+# ----------------------------
+# Model Loading
+# ----------------------------
+def load_ranker():
+    """
+    Import the ML stack, load the ranker and warm it up.
+
+    With SHARED_MODEL_DIR set, the vectorizer and tree arrays are memory-mapped
+    from that directory so all uvicorn workers share one copy; otherwise they
+    come from the precompiled artifact cache unless MODEL_CACHE_DIR is empty.
+    Returns (ranker, phase timings in seconds).
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    from ml_service import ResumeRanker
+    from model_artifacts import ModelArtifactCache
+    from shared_model import SharedModelStore
+    timings["imports"] = time.perf_counter() - started
+
+    shared_dir = os.getenv("SHARED_MODEL_DIR", "")
+    cache_dir = os.getenv("MODEL_CACHE_DIR", ".model_cache")
+    if shared_dir:
+        artifact_cache = SharedModelStore(shared_dir)
+    else:
+        artifact_cache = ModelArtifactCache(cache_dir) if cache_dir else None
+    ranker = ResumeRanker(
+        model_path=MODEL_PATH,
+        vectorizer_path=VECTORIZER_PATH,
+        inference_engine=os.getenv("RANKER_INFERENCE_ENGINE", "lightgbm"),
+        numpy_max_batch=int(os.getenv("RANKER_NUMPY_MAX_BATCH", "64")),
+        artifact_cache=artifact_cache,
+        prune_vectorizer=os.getenv("RANKER_PRUNE_VECTORIZER", "1") == "1",
+        ranking_state=RankingStateStore(
+            max_jobs=int(os.getenv("RANKING_STATE_MAX_JOBS", "1000")),
+            ttl=float(os.getenv("RANKING_STATE_TTL", str(24 * 3600)))
+        )
+    )
+    timings.update(ranker.load_timings)
+
+    started = time.perf_counter()
+    ranker.warm_up()
+    timings["warm_up"] = time.perf_counter() - started
+
+    return ranker, timings
+
+
+async def start_ranker(app, started):
+    """Load the ranker off the event loop, then mark the service ready"""
+    try:
+        async with app.state.reload_lock:
+            app.state.ranker, timings = await asyncio.to_thread(load_ranker)
+        metrics.set_model_info(app.state.ranker)
+        app.state.ready = True
+        logger.info("ML model loaded", extra={'model_version': app.state.ranker.model_version})
+    except Exception as e:
+        logger.error("Error loading ML model: %s", e)
+        app.state.ranker = None
+        timings = {}
+
+    timings["total"] = time.perf_counter() - started
+    app.state.startup_timings = {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()}
+    logger.info("Startup phases (ms): %s", ", ".join(
+        f"{phase}={ms}" for phase, ms in app.state.startup_timings.items()
+    ), extra={'startup_ms': app.state.startup_timings})
+
+
+async def reload_ranker(app, reason):
+    """
+    Load, warm up and validate a new ranker in the background, then swap it in.
+    Handlers take their own reference to app.state.ranker, so requests already
+    in flight finish on the previous version. On failure the old ranker stays.
+    """
+    async with app.state.reload_lock:
+        old_version = app.state.ranker.model_version if app.state.ranker else None
+        logger.info("Reloading ML model (%s)", reason)
+        ranker, timings = await asyncio.to_thread(load_ranker)
+
+        app.state.ranker = ranker  # single reference assignment: atomic for readers
+        metrics.set_model_info(ranker, previous_version=old_version)
+        app.state.ready = True
+        logger.info("ML model reloaded: %s -> %s", old_version, ranker.model_version)
+        return {
+            "previous_version": old_version,
+            "model_version": ranker.model_version,
+            "timings_ms": {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()}
+        }
 
 
 # ----------------------------
@@ -16,21 +143,101 @@ from pdf_extractor import PDFTextExtractor
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load ML model on startup"""
-    try:
-        app.state.ranker = ResumeRanker(
-            model_path="lightgbm_ranking.txt",
-            vectorizer_path="ranking.pkl"
+    from feature_store import FeatureStore
+    from resume_fetcher import ResumeFetcher
+    from ranking_jobs import RankingJobManager
+
+    started = time.perf_counter()
+    app.state.ranker = None
+    app.state.ready = False
+    app.state.startup_timings = {}
+    app.state.reload_lock = asyncio.Lock()
+
+    # "background" serves /health immediately and loads the model
+    # behind /ready; "eager" finishes loading before serving
+    if os.getenv("STARTUP_MODE", "eager") == "background":
+        app.state.ranker_loader = asyncio.create_task(start_ranker(app, started))
+    else:
+        await start_ranker(app, started)
+
+    app.state.resume_cache = ResumeTextCache(
+        cache_dir=os.getenv("RESUME_CACHE_DIR", ".resume_cache") or None,
+        memory_entries=int(os.getenv("RESUME_CACHE_MEMORY_ENTRIES", "512")),
+        max_disk_bytes=int(os.getenv("RESUME_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        max_age=float(os.getenv("RESUME_CACHE_MAX_AGE", str(7 * 24 * 3600))),
+        fresh_for=float(os.getenv("RESUME_CACHE_FRESH_FOR", "300"))
+    )
+
+    app.state.parse_pool = None
+    parse_workers = int(os.getenv("PDF_PARSE_WORKERS", str(os.cpu_count() or 1)))
+    if parse_workers > 0:
+        app.state.parse_pool = PDFParsePool(
+            workers=parse_workers,
+            max_tasks_per_child=int(os.getenv("PDF_PARSE_MAX_TASKS_PER_CHILD", "100")),
+            timeout=float(os.getenv("PDF_PARSE_TIMEOUT", "20"))
         )
-        print("✓ ML Model loaded successfully")
-    except Exception as e:
-        print(f"✗ Error loading ML model: {e}")
-        app.state.ranker = None
+        app.state.parse_pool.start()
+
+    # e.g. RESUME_EXTRA_SECTIONS='{"certifications": ["certifications", "licenses"]}'
+    extra_sections = json.loads(os.getenv("RESUME_EXTRA_SECTIONS", "{}"))
+    app.state.pdf_extractor = PDFTextExtractor(
+        cache=app.state.resume_cache,
+        parse_pool=app.state.parse_pool,
+        limits=EXTRACTION_LIMITS,
+        section_scanner=SectionScanner.with_extra_headers(extra_sections) if extra_sections else DEFAULT_SCANNER
+    )
 
-    app.state.pdf_extractor = PDFTextExtractor()
+    # Resume text and term counts written by /ingest; empty disables it
+    feature_store_dir = os.getenv("FEATURE_STORE_DIR", ".feature_store")
+    app.state.feature_store = FeatureStore(feature_store_dir) if feature_store_dir else None
+
+    app.state.resume_fetcher = ResumeFetcher(
+        max_concurrency=int(os.getenv("RESUME_FETCH_CONCURRENCY", "32")),
+        max_per_host=int(os.getenv("RESUME_FETCH_PER_HOST", "8")),
+        retries=int(os.getenv("RESUME_FETCH_RETRIES", "3")),
+        timeout=float(os.getenv("RESUME_FETCH_TIMEOUT", "30")),
+        max_bytes=optional_limit("RESUME_MAX_BYTES", 10 * 1024 * 1024),
+        spool_bytes=int(os.getenv("RESUME_SPOOL_BYTES", str(1024 * 1024))),
+        spool_dir=os.getenv("RESUME_SPOOL_DIR") or None
+    )
+    await app.state.resume_fetcher.start()
+
+    app.state.inference = InferenceExecutor(
+        workers=int(os.getenv("INFERENCE_WORKERS", "2")),
+        max_queue=int(os.getenv("INFERENCE_MAX_QUEUE", "8"))
+    )
+
+    app.state.ranking_jobs = RankingJobManager(
+        run_ranking_job,
+        workers=int(os.getenv("RANK_JOB_WORKERS", "2")),
+        max_pending=int(os.getenv("RANK_JOB_MAX_PENDING", "100")),
+        ttl=float(os.getenv("RANK_JOB_TTL", "3600")),
+        # e.g. RANK_JOB_CALLBACK_HOSTS=backend.internal,api.example.com
+        callback_hosts=os.getenv("RANK_JOB_CALLBACK_HOSTS", "").split(",")
+    )
+    await app.state.ranking_jobs.start()
+
+    app.state.model_watcher = None
+    watch_interval = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
+    if watch_interval > 0:
+        app.state.model_watcher = ModelFileWatcher(
+            [MODEL_PATH, VECTORIZER_PATH],
+            lambda: reload_ranker(app, "model files changed"),
+            interval=watch_interval
+        )
+        app.state.model_watcher.start()
 
     yield  # App runs here
 
-    print("Shutting down Resume Ranking ML Service...")
+    logger.info("Shutting down Resume Ranking ML Service")
+    if app.state.model_watcher is not None:
+        await app.state.model_watcher.close()
+    await app.state.ranking_jobs.close()
+    await app.state.resume_fetcher.close()
+    if app.state.parse_pool is not None:
+        app.state.parse_pool.shutdown()
+    app.state.inference.shutdown()
+    app.state.resume_cache.close()
 
 
 # ----------------------------
@@ -56,6 +263,41 @@ app.add_middleware(
 )
 
 
+# ----------------------------
+# Admin Access / Request Profiling
+# ----------------------------
+def admin_rejection(x_admin_token):
+    """None if the X-Admin-Token header matches ADMIN_TOKEN, else (status, detail)"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        return 403, "Admin endpoints are disabled (ADMIN_TOKEN not set)"
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        return 401, "Invalid admin token"
+    return None
+
+
+def require_admin(x_admin_token):
+    rejection = admin_rejection(x_admin_token)
+    if rejection is not None:
+        raise HTTPException(status_code=rejection[0], detail=rejection[1])
+
+
+# Opt-in per request (X-Profile header or ?profile=), admin token required
+profile_store = ProfileStore(
+    directory=os.getenv("PROFILE_DIR", ".profiles"),
+    keep=int(os.getenv("PROFILE_KEEP", "20"))
+)
+app.add_middleware(
+    ProfilingMiddleware,
+    paths=["/rank", "/extract-text"],
+    store=profile_store,
+    authorize=lambda headers: admin_rejection(headers.get("x-admin-token"))
+)
+
+# Outermost, so every log line of a request carries its X-Request-ID
+app.add_middleware(RequestIdMiddleware)
+
+
 # ----------------------------
 # Request / Response Models
 # ----------------------------
@@ -71,9 +313,20 @@ class ApplicationInput(BaseModel):
     applicantProfile: Optional[Dict[str, Any]] = None
 
 
+class ExtractionLimitsInput(BaseModel):
+    max_pages: Optional[int] = None
+    max_chars: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+    def to_limits(self):
+        return ExtractionLimits(self.max_pages, self.max_chars, self.max_seconds)
+
+
 class RankingRequest(BaseModel):
     applications: List[ApplicationInput]
     job_description: str
+    job_id: Optional[str] = None
+    extraction_limits: Optional[ExtractionLimitsInput] = None
 
 
 class ApplicationOutput(ApplicationInput):
@@ -92,6 +345,218 @@ class RankingResponse(BaseModel):
     message: Optional[str] = None
 
 
+class BatchRankingJob(BaseModel):
+    job_id: Optional[str] = None
+    job_description: str
+    applications: List[ApplicationInput]
+
+
+class BatchRankingRequest(BaseModel):
+    jobs: List[BatchRankingJob]
+    extraction_limits: Optional[ExtractionLimitsInput] = None
+
+
+class BatchRankingResult(BaseModel):
+    job_id: Optional[str] = None
+    ranked_applications: List[ApplicationOutput]
+    total_applications: int
+    category_summary: Dict[str, int]
+
+
+class BatchRankingResponse(BaseModel):
+    success: bool
+    results: List[BatchRankingResult]
+    total_applications: int
+    unique_resumes: int
+    message: Optional[str] = None
+
+
+class IngestRequest(BaseModel):
+    applications: List[ApplicationInput]
+    extraction_limits: Optional[ExtractionLimitsInput] = None
+
+
+class IngestResponse(BaseModel):
+    success: bool
+    ingested: int
+    skipped: List[str]
+    message: Optional[str] = None
+
+
+class RankingJobRequest(RankingRequest):
+    callback_url: Optional[str] = None
+
+
+class RankingJobStatus(BaseModel):
+    job_id: str
+    status: str
+    progress: Dict[str, int]
+    created_at: float
+    finished_at: Optional[float] = None
+    result: Optional[RankingResponse] = None
+    error: Optional[str] = None
+
+
+# ----------------------------
+# Resume Extraction
+# ----------------------------
+def set_resume_text(app_data, resume_text):
+    """resume_text is the extracted resume followed by the cover letter"""
+    cover_letter = app_data.get("coverLetter") or ""
+    app_data["resume_text"] = f"{resume_text} {cover_letter}" if resume_text else cover_letter
+    return app_data
+
+
+def request_limits(request):
+    """Per-request ExtractionLimits of a ranking request, or None"""
+    limits = getattr(request, "extraction_limits", None)
+    return limits.to_limits() if limits is not None else None
+
+
+async def extract_resume(resume_url, limits=None):
+    logger.info("Extracting resume text", extra={'url': resume_url, **PER_RESUME})
+    return await app.state.pdf_extractor.extract_from_url_async(
+        resume_url, app.state.resume_fetcher, limits
+    )
+
+
+async def attach_resume_text(app_data, limits=None):
+    """Download and extract one resume, setting resume_text in place"""
+    resume_url = app_data.get("resumeFileUrl")
+    resume_text = await extract_resume(resume_url, limits) if resume_url else ""
+    return set_resume_text(app_data, resume_text)
+
+
+async def attach_resume_texts(applications_dict, limits=None):
+    """Download and extract all resumes concurrently, setting resume_text in place"""
+    await asyncio.gather(*(attach_resume_text(app_data, limits) for app_data in applications_dict))
+
+
+async def iter_resume_texts(applications_dict, limits=None):
+    """Like attach_resume_texts, but yields each application as soon as it is extracted"""
+    tasks = [asyncio.ensure_future(attach_resume_text(app_data, limits)) for app_data in applications_dict]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def attach_unique_resume_texts(applications_dict, limits=None):
+    """attach_resume_texts that downloads each distinct resume URL only once"""
+    urls = list({app_data["resumeFileUrl"] for app_data in applications_dict if app_data.get("resumeFileUrl")})
+    texts = dict(zip(urls, await asyncio.gather(*(extract_resume(url, limits) for url in urls))))
+    for app_data in applications_dict:
+        set_resume_text(app_data, texts.get(app_data.get("resumeFileUrl"), ""))
+    return len(urls)
+
+
+async def attach_stored_features(ranker, applications_dict):
+    """
+    Look up applications ingested earlier (see /ingest), setting resume_text
+    in place for each one found.
+
+    Returns:
+        (stored, missing): stored term counts aligned with applications_dict
+        (None when nothing can be used) and the applications that still
+        need their resume extracted
+    """
+    store = app.state.feature_store
+    if store is None or not ranker.supports_stored_counts:
+        return None, applications_dict
+    try:
+        rows = await asyncio.to_thread(store.get_many, ranker.counts_version, applications_dict)
+    except Exception:
+        logger.exception("Feature store lookup failed, extracting all resumes")
+        return None, applications_dict
+
+    missing = []
+    for app_data, row in zip(applications_dict, rows):
+        if row is None:
+            missing.append(app_data)
+        else:
+            app_data["resume_text"] = row[0]
+    return [row[1] if row is not None else None for row in rows], missing
+
+
+# ----------------------------
+# Scoring (runs on the inference executor)
+# ----------------------------
+def score_applications(ranker, applications_dict, job_description, job_id=None, stored=None):
+    """Rank applications and build response models off the event loop"""
+    ranked_applications = ranker.rank_applications(
+        applications_dict, job_description, job_id=job_id, stored_counts=stored
+    )
+    with metrics.stage['serialize'].time():
+        output_applications = [
+            ApplicationOutput(**app) for app in ranked_applications
+        ]
+    category_summary = ranker.get_category_summary(ranked_applications)
+    return output_applications, category_summary
+
+
+def score_batch(ranker, groups):
+    """Rank several jobs with one predict call and build per-job results"""
+    ranked_groups = ranker.rank_batch(
+        [(applications, job.job_description) for job, applications in groups]
+    )
+    with metrics.stage['serialize'].time():
+        return [
+            BatchRankingResult(
+                job_id=job.job_id,
+                ranked_applications=[ApplicationOutput(**app) for app in ranked],
+                total_applications=len(ranked),
+                category_summary=ranker.get_category_summary(ranked)
+            )
+            for (job, _), ranked in zip(groups, ranked_groups)
+        ]
+
+
+# ----------------------------
+# Background Ranking Jobs
+# ----------------------------
+async def run_ranking_job(job):
+    """Runner for RankingJobManager: same pipeline as /rank, with progress"""
+    request_id.set(job.id)  # correlate the job's logs by its id
+    ranker = app.state.ranker
+    if not ranker:
+        raise RuntimeError("ML model not loaded")
+
+    request = job.request
+    metrics.APPLICANTS_PER_REQUEST.labels("/rank/jobs").observe(len(request.applications))
+    with metrics.RANKINGS_IN_FLIGHT.track_inprogress(), \
+            metrics.REQUEST_SECONDS.labels("/rank/jobs").time():
+        applications_dict = [app.dict() for app in request.applications]
+        stored, missing = await attach_stored_features(ranker, applications_dict)
+        job.progress["extracted"] += len(applications_dict) - len(missing)
+        async for _ in iter_resume_texts(missing, request_limits(request)):
+            job.progress["extracted"] += 1
+
+        while True:
+            try:
+                output_applications, category_summary = await app.state.inference.run(
+                    score_applications,
+                    ranker,
+                    applications_dict,
+                    request.job_description,
+                    request.job_id,
+                    stored
+                )
+                break
+            except InferenceQueueFull:
+                # Background jobs wait for capacity instead of failing
+                await asyncio.sleep(1.0)
+
+    return jsonable_encoder(RankingResponse(
+        success=True,
+        ranked_applications=output_applications,
+        total_applications=len(output_applications),
+        category_summary=category_summary,
+        message=f"Successfully ranked {len(output_applications)} applications"
+    ))
+
+
 # ----------------------------
 # API Endpoints
 # ----------------------------
@@ -109,14 +574,78 @@ async def health_check():
     ranker = app.state.ranker
     return {
         "status": "healthy" if ranker is not None else "unhealthy",
-        "model_loaded": ranker is not None
+        "model_loaded": ranker is not None,
+        "model_version": ranker.model_version if ranker else None,
+        "model_loaded_at": ranker.loaded_at if ranker else None,
+        "resume_cache": app.state.resume_cache.stats(),
+        "pdf_parse_pool": app.state.parse_pool.stats() if app.state.parse_pool else None,
+        "extraction_limits": app.state.pdf_extractor.limits.to_dict(),
+        "inference": app.state.inference.stats(),
+        "ranking_state": ranker.ranking_state.stats() if ranker else None,
+        "ranking_jobs": app.state.ranking_jobs.stats(),
+        "feature_store": app.state.feature_store.stats() if app.state.feature_store else None,
+        "worker_memory": process_memory(),
+        "logging": {"dropped_records": dropped_records()}
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 only once the model is loaded and warmed up"""
+    body = {
+        "ready": app.state.ready,
+        "startup_timings_ms": app.state.startup_timings
+    }
+    if not app.state.ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of the pipeline metrics"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+@app.post("/admin/reload-model")
+async def reload_model(x_admin_token: Optional[str] = Header(default=None)):
+    """Hot-reload the model and vectorizer from disk (requires ADMIN_TOKEN)"""
+    require_admin(x_admin_token)
+
+    try:
+        result = await reload_ranker(app, "admin request")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving the previous model: {str(e)}"
+        )
+    return {"success": True, **result}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str, format: str = "pstats",
+                           x_admin_token: Optional[str] = Header(default=None)):
+    """
+    A stored request profile: pstats dump (load with pstats/snakeviz)
+    or, with format=text, the top functions by cumulative time
+    """
+    require_admin(x_admin_token)
+    try:
+        path = profile_store.path(profile_id)
+        if format == "text":
+            return PlainTextResponse(profile_store.report(profile_id))
+    except (ValueError, OSError):
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return FileResponse(path, media_type="application/octet-stream",
+                        filename=f"{profile_id}.prof")
+
+
 @app.post("/rank", response_model=RankingResponse)
 async def rank_applications(request: RankingRequest):
     ranker = app.state.ranker
-    pdf_extractor = app.state.pdf_extractor
 
     if not ranker:
         raise HTTPException(status_code=503, detail="ML model not loaded")
@@ -130,65 +659,264 @@ async def rank_applications(request: RankingRequest):
             message="No applications to rank"
         )
 
+    metrics.APPLICANTS_PER_REQUEST.labels("/rank").observe(len(request.applications))
     try:
-        print(f"Ranking {len(request.applications)} applications...")
+        logger.info("Ranking %d applications", len(request.applications),
+                    extra={'applications': len(request.applications), 'job_id': request.job_id})
+
+        with metrics.RANKINGS_IN_FLIGHT.track_inprogress(), \
+                metrics.REQUEST_SECONDS.labels("/rank").time():
+            applications_dict = [app.dict() for app in request.applications]
+            stored, missing = await attach_stored_features(ranker, applications_dict)
+            await attach_resume_texts(missing, request_limits(request))
+
+            output_applications, category_summary = await app.state.inference.run(
+                score_applications,
+                ranker,
+                applications_dict,
+                request.job_description,
+                request.job_id,
+                stored
+            )
 
-        applications_dict = [app.dict() for app in request.applications]
+        return RankingResponse(
+            success=True,
+            ranked_applications=output_applications,
+            total_applications=len(output_applications),
+            category_summary=category_summary,
+            message=f"Successfully ranked {len(output_applications)} applications"
+        )
+
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except Exception as e:
+        logger.exception("Error ranking applications")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error ranking applications: {str(e)}"
+        )
+
+
+@app.post("/ingest", response_model=IngestResponse)
+async def ingest_applications(request: IngestRequest):
+    """
+    Extract and store the resume features of submitted applications, so
+    /rank can score them later without downloading or parsing the PDFs.
+    Applications whose resume could not be extracted are skipped.
+    """
+    ranker = app.state.ranker
+    store = app.state.feature_store
 
-        for app_data in applications_dict:
-            resume_url = app_data.get("resumeFileUrl")
-
-            if resume_url:
-                try:
-                    print(f"Extracting text from: {resume_url}")
-                    resume_text = pdf_extractor.extract_from_url(resume_url)
-                    cover_letter = app_data.get("coverLetter", "")
-                    app_data["resume_text"] = f"{resume_text} {cover_letter}"
-                except Exception as e:
-                    print(f"Error extracting resume: {e}")
-                    app_data["resume_text"] = app_data.get("coverLetter", "")
+    if not ranker:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store is disabled")
+    if not ranker.supports_stored_counts:
+        raise HTTPException(status_code=501, detail="The loaded vectorizer does not support stored features")
+
+    try:
+        applications_dict = [app.dict() for app in request.applications]
+        limits = request_limits(request)
+        resume_texts = await asyncio.gather(*(
+            extract_resume(app_data["resumeFileUrl"], limits) if app_data.get("resumeFileUrl") else asyncio.sleep(0, "")
+            for app_data in applications_dict
+        ))
+
+        ingest, skipped = [], []
+        for app_data, resume_text in zip(applications_dict, resume_texts):
+            # No text from a resume URL is a failed download; /rank retries it
+            if app_data.get("resumeFileUrl") and not resume_text:
+                skipped.append(app_data["id"])
             else:
-                app_data["resume_text"] = app_data.get("coverLetter", "")
+                ingest.append(set_resume_text(app_data, resume_text))
+
+        if ingest:
+            texts = [app_data["resume_text"] for app_data in ingest]
+            counts = await app.state.inference.run(ranker.count_resumes, texts)
+            await asyncio.to_thread(store.put_many, ranker.counts_version, ingest, texts, counts)
 
-        ranked_applications = ranker.rank_applications(
-            applications_dict,
-            request.job_description
+        logger.info("Ingested %d applications", len(ingest),
+                    extra={'ingested': len(ingest), 'skipped': len(skipped)})
+        return IngestResponse(
+            success=True,
+            ingested=len(ingest),
+            skipped=skipped,
+            message=f"Ingested {len(ingest)} applications"
         )
 
-        output_applications = [
-            ApplicationOutput(**app) for app in ranked_applications
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except Exception as e:
+        logger.exception("Error ingesting applications")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error ingesting applications: {str(e)}"
+        )
+
+
+@app.post("/rank/stream")
+async def rank_applications_stream(request: RankingRequest):
+    """
+    Streaming variant of /rank (NDJSON, one event per line):
+    started -> extracted (per resume) -> scoring -> ranked (chunks) -> done
+    """
+    ranker = app.state.ranker
+
+    if not ranker:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+
+    chunk_size = int(os.getenv("RANK_STREAM_CHUNK_SIZE", "100"))
+
+    def event(name, **data):
+        return json.dumps({"event": name, **jsonable_encoder(data)}) + "\n"
+
+    async def events():
+        total = len(request.applications)
+        metrics.APPLICANTS_PER_REQUEST.labels("/rank/stream").observe(total)
+        yield event("started", total=total)
+
+        with metrics.RANKINGS_IN_FLIGHT.track_inprogress(), \
+                metrics.REQUEST_SECONDS.labels("/rank/stream").time():
+            try:
+                applications_dict = [app.dict() for app in request.applications]
+                stored, missing = await attach_stored_features(ranker, applications_dict)
+                completed = 0
+                for app_data in applications_dict:
+                    if "resume_text" in app_data:
+                        completed += 1
+                        yield event("extracted", id=app_data["id"], completed=completed, total=total)
+                async for app_data in iter_resume_texts(missing, request_limits(request)):
+                    completed += 1
+                    yield event("extracted", id=app_data["id"], completed=completed, total=total)
+
+                yield event("scoring", total=total)
+                output_applications, category_summary = await app.state.inference.run(
+                    score_applications,
+                    ranker,
+                    applications_dict,
+                    request.job_description,
+                    request.job_id,
+                    stored
+                )
+
+                for offset in range(0, len(output_applications), chunk_size):
+                    yield event(
+                        "ranked",
+                        offset=offset,
+                        applications=output_applications[offset:offset + chunk_size]
+                    )
+
+                yield event(
+                    "done",
+                    success=True,
+                    total_applications=len(output_applications),
+                    category_summary=category_summary
+                )
+
+            except Exception as e:
+                logger.exception("Error ranking applications")
+                yield event("error", success=False, detail=f"Error ranking applications: {str(e)}")
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.post("/rank/batch", response_model=BatchRankingResponse)
+async def rank_batch(request: BatchRankingRequest):
+    """
+    Rank many jobs in one call. Resumes shared between jobs are downloaded
+    and tokenized once, and all jobs are scored with a single predict call.
+    """
+    ranker = app.state.ranker
+
+    if not ranker:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+
+    try:
+        groups = [
+            (job, [app.dict() for app in job.applications]) for job in request.jobs
         ]
+        all_applications = [app_data for _, applications in groups for app_data in applications]
+        logger.info("Batch ranking %d applications across %d jobs", len(all_applications), len(groups),
+                    extra={'applications': len(all_applications), 'jobs': len(groups)})
+        metrics.APPLICANTS_PER_REQUEST.labels("/rank/batch").observe(len(all_applications))
 
-        category_summary = ranker.get_category_summary(ranked_applications)
+        with metrics.RANKINGS_IN_FLIGHT.track_inprogress(), \
+                metrics.REQUEST_SECONDS.labels("/rank/batch").time():
+            unique_resumes = await attach_unique_resume_texts(all_applications, request_limits(request))
+            results = await app.state.inference.run(score_batch, ranker, groups)
 
-        return RankingResponse(
+        return BatchRankingResponse(
             success=True,
-            ranked_applications=output_applications,
-            total_applications=len(output_applications),
-            category_summary=category_summary,
-            message=f"Successfully ranked {len(output_applications)} applications"
+            results=results,
+            total_applications=len(all_applications),
+            unique_resumes=unique_resumes,
+            message=f"Successfully ranked {len(all_applications)} applications across {len(groups)} jobs"
         )
 
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error ranking applications")
         raise HTTPException(
             status_code=500,
             detail=f"Error ranking applications: {str(e)}"
         )
 
 
+@app.post("/rank/jobs", response_model=RankingJobStatus, status_code=202)
+async def submit_ranking_job(request: RankingJobRequest, x_admin_token: Optional[str] = Header(default=None)):
+    if not app.state.ranker:
+        raise HTTPException(status_code=503, detail="ML model not loaded")
+
+    # The service POSTs results to callback_url: only to allowlisted hosts,
+    # unless the caller holds the admin token
+    if request.callback_url and not app.state.ranking_jobs.callback_allowed(request.callback_url) \
+            and admin_rejection(x_admin_token) is not None:
+        raise HTTPException(
+            status_code=403,
+            detail="callback_url host is not in RANK_JOB_CALLBACK_HOSTS (or send X-Admin-Token)"
+        )
+
+    try:
+        job = app.state.ranking_jobs.submit(request, callback_url=request.callback_url)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Too many pending ranking jobs")
+
+    logger.info("Queued ranking job %s (%d applications)", job.id, len(request.applications),
+                extra={'ranking_job': job.id, 'applications': len(request.applications)})
+    return job.to_dict()
+
+
+@app.get("/rank/jobs/{job_id}", response_model=RankingJobStatus)
+async def get_ranking_job(job_id: str):
+    job = app.state.ranking_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ranking job not found or expired")
+    return job.to_dict()
+
+
 @app.post("/extract-text")
-async def extract_text(pdf_url: str):
+async def extract_text(pdf_url: str, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                       max_seconds: Optional[float] = None):
     pdf_extractor = app.state.pdf_extractor
     try:
-        text = pdf_extractor.extract_from_url(pdf_url)
-        sections = pdf_extractor.extract_key_sections(text)
+        result = await pdf_extractor.extract_result_from_url_async(
+            pdf_url, app.state.resume_fetcher, ExtractionLimits(max_pages, max_chars, max_seconds)
+        )
+        text = result.text
+        sections = pdf_extractor.extract_key_sections(text, pdf_extractor.section_scanner)
         return {
             "success": True,
             "text": text,
             "sections": sections,
-            "length": len(text)
+            "length": len(text),
+            "truncated": result.truncated,
+            "truncated_reason": result.reason,
+            "pages_read": result.pages_read,
+            "total_pages": result.total_pages
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -223,7 +951,10 @@ async def test_ranking():
     ]
 
     job_desc = "Looking for Python ML Engineer with deep learning and NLP experience"
-    ranked = ranker.rank_applications(test_applications, job_desc)
+    try:
+        ranked = await app.state.inference.run(ranker.rank_applications, test_applications, job_desc)
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
     return {
         "success": True,
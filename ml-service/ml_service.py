@@ -7,55 +7,335 @@
 
 
 
-import lightgbm as lgb
 import pickle
 import numpy as np
-import re
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from ranking_state import RankingStateStore
+from pruned_vectorizer import PrunedVectorizer
+from service_metrics import stage
+from text_normalizer import WORD_TEXT
+from tree_predictor import TreeEnsemblePredictor
+
+logger = logging.getLogger(__name__)
 
 class ResumeRanker:
-    def __init__(self, model_path='lightgbm_ranking.txt', vectorizer_path='ranking.pkl'):
-        """Initialize the ranking model and vectorizer"""
-        try:
-            self.model = lgb.Booster(model_file=model_path)
-            print(f"✓ Model loaded from {model_path}")
-        except Exception as e:
-            print(f"✗ Error loading model: {e}")
-            raise
+    def __init__(self, model_path='lightgbm_ranking.txt', vectorizer_path='ranking.pkl', ranking_state=None,
+                 inference_engine='lightgbm', numpy_max_batch=64, artifact_cache=None,
+                 prune_vectorizer=True):
+        """
+        Initialize the ranking model and vectorizer
+        
+        inference_engine selects who evaluates the trees: 'lightgbm' (Booster),
+        'numpy' (TreeEnsemblePredictor) or 'auto' (numpy for batches of at most
+        numpy_max_batch rows, LightGBM above). The Booster is the fallback:
+        with 'numpy' and a compiled predictor it (and the lightgbm import,
+        most of a cold start) is deferred until a prediction falls back.
+        
+        artifact_cache is an optional ModelArtifactCache or SharedModelStore;
+        when given, the vectorizer and compiled trees are loaded from its
+        precompiled (or memory-mapped, shared between workers) copies.
+        Load times per artifact are kept in self.load_timings (seconds).
+        
+        prune_vectorizer replaces a supported sklearn vectorizer with a
+        PrunedVectorizer that only matches the terms of the model's columns.
+        """
+        self.load_timings = {}
+        self.model_version = self.artifact_version(model_path, vectorizer_path)
+        self.vectorizer_version = self.artifact_version(vectorizer_path)
+        self.loaded_at = time.time()
+        self.model_path = model_path
+        self._model = None
+        self._model_lock = threading.Lock()
+        
+        self.inference_engine = inference_engine
+        self.numpy_max_batch = numpy_max_batch
+        self.tree_predictor = None
+        if inference_engine in ('numpy', 'auto'):
+            try:
+                started = time.perf_counter()
+                if artifact_cache is not None:
+                    self.tree_predictor = artifact_cache.load_tree_predictor(model_path)
+                else:
+                    self.tree_predictor = TreeEnsemblePredictor(model_path)
+                self.load_timings['tree_predictor'] = time.perf_counter() - started
+                logger.info("NumPy tree predictor compiled (%d trees)", self.tree_predictor.num_trees)
+            except Exception as e:
+                logger.warning("NumPy tree predictor unavailable, using LightGBM: %s", e)
+        
+        if inference_engine != 'numpy' or self.tree_predictor is None:
+            self._load_model()  # now, so a broken model file fails the start
         
         try:
-            with open(vectorizer_path, 'rb') as f:
-                self.vectorizer = pickle.load(f)
-            print(f"✓ Vectorizer loaded from {vectorizer_path}")
+            started = time.perf_counter()
+            if artifact_cache is not None:
+                self.vectorizer = artifact_cache.load_vectorizer(vectorizer_path)
+            else:
+                with open(vectorizer_path, 'rb') as f:
+                    self.vectorizer = pickle.load(f)
+            self.load_timings['vectorizer'] = time.perf_counter() - started
+            logger.info("Vectorizer loaded from %s", vectorizer_path)
         except Exception as e:
-            print(f"✗ Error loading vectorizer: {e}")
+            logger.error("Error loading vectorizer: %s", e)
             raise
         
         self.num_features = 386  # Based on your model
+        
+        if prune_vectorizer and PrunedVectorizer.supports(self.vectorizer):
+            started = time.perf_counter()
+            self.vectorizer = PrunedVectorizer(self.vectorizer, self.num_features)
+            self.load_timings['prune_vectorizer'] = time.perf_counter() - started
+            logger.info("Vectorizer pruned to %d terms", len(self.vectorizer.columns))
+        
+        # Job description term counts, keyed by hash of the job text
+        self._job_counts = OrderedDict()
+        self._job_counts_lock = threading.Lock()
+        self._job_counts_max = 64
+        self._additive_counts = self._supports_additive_counts(self.vectorizer)
+        
+        # Scores from earlier rankings, for incremental re-ranking by job id
+        self.ranking_state = ranking_state if ranking_state is not None else RankingStateStore()
+    
+    @property
+    def model(self):
+        """The LightGBM Booster, loaded on first use"""
+        return self._model if self._model is not None else self._load_model()
+    
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    started = time.perf_counter()
+                    import lightgbm as lgb
+                    self._model = lgb.Booster(model_file=self.model_path)
+                    self.load_timings['model'] = time.perf_counter() - started
+                    logger.info("Model loaded from %s", self.model_path)
+                except Exception as e:
+                    logger.error("Error loading model: %s", e)
+                    raise
+        return self._model
+    
+    @staticmethod
+    def artifact_version(*paths):
+        """Short content hash identifying the model + vectorizer pair"""
+        digest = hashlib.sha1()
+        for path in paths:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        return digest.hexdigest()[:12]
+    
+    def warm_up(self):
+        """
+        Run one throwaway prediction so lazily initialized parts of the
+        tokenizer, tf-idf transform and booster are ready before real traffic.
+        Raises if the ranker cannot produce a finite score.
+        """
+        features = self._model_columns(self.transform_with_job(
+            ["python developer machine learning experience"],
+            "looking for a python machine learning engineer"
+        ))
+        scores = self.predict(features)
+        if len(scores) != 1 or not np.all(np.isfinite(scores)):
+            raise RuntimeError(f"Warm-up prediction returned {scores!r}")
+        return float(scores[0])
     
     def extract_text_from_resume(self, resume_text):
         """Extract and clean text from resume"""
         if not resume_text:
             return ""
-        text = re.sub(r'[^\w\s]', ' ', resume_text.lower())
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        return WORD_TEXT.normalize(resume_text)
+    
+    @staticmethod
+    def _supports_additive_counts(vectorizer):
+        """
+        Whether counts of "resume jd" equal counts(resume) + counts(jd).
+        True for word unigram CountVectorizer/TfidfVectorizer, where the
+        joining space can never create or split a token, and for the
+        SharedVectorizer built from one.
+        """
+        if hasattr(vectorizer, 'count_terms'):
+            return True
+        return (
+            isinstance(vectorizer, CountVectorizer)
+            and vectorizer.analyzer == 'word'
+            and tuple(vectorizer.ngram_range) == (1, 1)
+            and hasattr(vectorizer, 'vocabulary_')
+        )
+    
+    def job_description_counts(self, job_description):
+        """Term counts of a job description, computed once per distinct text"""
+        key = hashlib.sha1(job_description.encode('utf-8')).hexdigest()
+        with self._job_counts_lock:
+            counts = self._job_counts.get(key)
+            if counts is not None:
+                self._job_counts.move_to_end(key)
+                return counts
+        
+        counts = self._count_terms([job_description]).tocsr()
+        with self._job_counts_lock:
+            self._job_counts[key] = counts
+            while len(self._job_counts) > self._job_counts_max:
+                self._job_counts.popitem(last=False)
+        return counts
+    
+    def transform_with_job(self, resume_texts, job_description):
+        """
+        Vectorize each resume combined with the job description.
+        
+        Equivalent to vectorizer.transform([f"{resume} {job_description}", ...])
+        but tokenizes the job description only once per job.
+        """
+        if not self._additive_counts:
+            combined_texts = [f"{resume} {job_description}" for resume in resume_texts]
+            return self.vectorizer.transform(combined_texts)
+        
+        return self.transform_counts_with_job(self._count_terms(resume_texts), job_description)
+    
+    def transform_counts_with_job(self, resume_counts, job_description):
+        """transform_with_job for resume term counts computed earlier (see count_resumes)"""
+        n_applicants = resume_counts.shape[0]
+        job_counts = self.job_description_counts(job_description)
+        
+        # Repeat the single job row n times without materializing n dense rows
+        job_rows = sparse.csr_matrix(
+            (
+                np.tile(job_counts.data, n_applicants),
+                np.tile(job_counts.indices, n_applicants),
+                np.arange(n_applicants + 1) * job_counts.nnz
+            ),
+            shape=(n_applicants, job_counts.shape[1])
+        )
+        return self._counts_to_tfidf(resume_counts + job_rows)
+    
+    def transform_with_jobs(self, resume_texts, job_descriptions, job_index):
+        """
+        Vectorize many (resume, job description) pairs in one matrix.
+        
+        Row i is resume_texts[i] combined with job_descriptions[job_index[i]].
+        Identical resume texts (e.g. one applicant applying to several jobs)
+        and each job description are tokenized only once.
+        """
+        if not self._additive_counts:
+            combined_texts = [
+                f"{resume} {job_descriptions[j]}" for resume, j in zip(resume_texts, job_index)
+            ]
+            return self.vectorizer.transform(combined_texts)
+        
+        unique_texts = {}
+        resume_index = [unique_texts.setdefault(text, len(unique_texts)) for text in resume_texts]
+        resume_counts = self._count_terms(list(unique_texts)).tocsr()
+        job_counts = sparse.vstack(
+            [self.job_description_counts(jd) for jd in job_descriptions], format='csr'
+        )
+        
+        counts = resume_counts[np.asarray(resume_index)] + job_counts[np.asarray(job_index)]
+        return self._counts_to_tfidf(counts)
+    
+    @property
+    def counts_version(self):
+        """
+        Identifies the column space of count_resumes; stored counts are
+        only valid for a ranker with the same value. Depends on the
+        vectorizer alone, so counts survive a retrained or reloaded model.
+        """
+        if isinstance(self.vectorizer, PrunedVectorizer):
+            mode = f"pruned{self.vectorizer.n_features}"
+        else:
+            mode = "full"
+        return f"{self.vectorizer_version}-{type(self.vectorizer).__name__}-{mode}"
+    
+    @property
+    def supports_stored_counts(self):
+        """Whether features can be built from resume counts computed earlier"""
+        return self._additive_counts
+    
+    def count_resumes(self, resume_texts):
+        """Raw term counts of resume texts (CSR), for a FeatureStore"""
+        return self._count_terms(resume_texts).tocsr()
+    
+    def merge_counts(self, resume_texts, stored_counts):
+        """
+        Term counts for resume_texts where stored_counts[i] (a 1-row CSR)
+        is used instead of tokenizing text i when it is not None
+        """
+        missing = [i for i, counts in enumerate(stored_counts) if counts is None]
+        present = [i for i, counts in enumerate(stored_counts) if counts is not None]
+        parts = [stored_counts[i] for i in present]
+        if missing:
+            parts.append(self.count_resumes([resume_texts[i] for i in missing]))
+        stacked = sparse.vstack(parts, format='csr')
+        
+        # Rows are stacked as present + missing; put them back in input order
+        position = np.empty(len(stored_counts), dtype=np.int64)
+        position[present + missing] = np.arange(len(stored_counts))
+        return stacked[position]
+    
+    def _count_terms(self, texts):
+        """Raw term counts, without the tf-idf step of vectorizer.transform"""
+        if hasattr(self.vectorizer, 'count_terms'):
+            return self.vectorizer.count_terms(texts)
+        return CountVectorizer.transform(self.vectorizer, texts)
+    
+    def _counts_to_tfidf(self, counts):
+        counts = counts.tocsr()
+        counts.sort_indices()
+        if self.vectorizer.binary:
+            counts.data[:] = 1
+        
+        if hasattr(self.vectorizer, 'counts_to_tfidf'):
+            return self.vectorizer.counts_to_tfidf(counts, copy=False)
+        tfidf = getattr(self.vectorizer, '_tfidf', None)
+        if tfidf is not None:
+            return tfidf.transform(counts, copy=False)
+        return counts
+    
+    def _model_columns(self, tfidf_features):
+        """Keep the first num_features columns as CSR float32"""
+        features = sparse.csr_matrix(tfidf_features[:, :self.num_features], dtype=np.float32)
+        if features.shape[1] < self.num_features:
+            features.resize((features.shape[0], self.num_features))
+        return features
     
     def prepare_features(self, resume_texts, job_description):
-        """Prepare features for ranking"""
+        """
+        Prepare features for ranking
+        
+        Returns a CSR float32 matrix of shape (n_applicants, num_features),
+        keeping only the vocabulary columns the model was trained on.
+        The booster accepts it directly, so no dense copy is made.
+        """
         n_applicants = len(resume_texts)
-        features = np.zeros((n_applicants, self.num_features))
-        combined_texts = [f"{resume} {job_description}" for resume in resume_texts]
         
         try:
             if hasattr(self.vectorizer, 'transform'):
-                tfidf_features = self.vectorizer.transform(combined_texts).toarray()
-                feature_count = min(tfidf_features.shape[1], self.num_features)
-                features[:, :feature_count] = tfidf_features[:, :feature_count]
+                return self._model_columns(self.transform_with_job(resume_texts, job_description))
         except Exception as e:
-            print(f"Error in feature extraction: {e}")
+            logger.error("Error in feature extraction: %s", e)
             pass
         
-        return features
+        return sparse.csr_matrix((n_applicants, self.num_features), dtype=np.float32)
+    
+    def prepare_batch_features(self, resume_texts, job_descriptions, job_index):
+        """prepare_features for rows spanning several jobs (see transform_with_jobs)"""
+        n_rows = len(resume_texts)
+        
+        try:
+            if hasattr(self.vectorizer, 'transform'):
+                return self._model_columns(
+                    self.transform_with_jobs(resume_texts, job_descriptions, job_index)
+                )
+        except Exception as e:
+            logger.error("Error in feature extraction: %s", e)
+            pass
+        
+        return sparse.csr_matrix((n_rows, self.num_features), dtype=np.float32)
     
     def categorize_score(self, score, all_scores):
         """Categorize score into Best, Average, Weak"""
@@ -73,35 +353,173 @@ class ResumeRanker:
         else:
             return "Weak Match"
     
-    def rank_applications(self, applications, job_description):
-        """Rank applications and assign categories"""
-        if not applications:
-            return []
-        
-        resume_texts = [app.get('resume_text', '') for app in applications]
-        features = self.prepare_features(resume_texts, job_description)
+    def predict(self, features):
+        """Model scores for a feature matrix, using the configured engine"""
+        use_numpy = self.tree_predictor is not None and (
+            self.inference_engine == 'numpy' or features.shape[0] <= self.numpy_max_batch
+        )
+        if use_numpy:
+            try:
+                return self.tree_predictor.predict(features)
+            except Exception as e:
+                logger.warning("NumPy tree predictor failed, falling back to LightGBM: %s", e)
+        return np.asarray(self.model.predict(features), dtype=float)
+    
+    def score_texts(self, resume_texts, job_description, resume_counts=None):
+        """
+        Predict scores for resume texts
+        
+        resume_counts (CSR, one row per text) skips tokenizing the texts
+        when their counts were computed earlier, e.g. at ingest time.
+        
+        Returns (scores, ok); ok is False when prediction failed and the
+        scores are random placeholders that must not be remembered.
+        """
+        with stage['vectorize'].time():
+            if resume_counts is None:
+                features = self.prepare_features(resume_texts, job_description)
+            else:
+                features = self._model_columns(self.transform_counts_with_job(resume_counts, job_description))
         
         try:
-            scores = np.asarray(self.model.predict(features), dtype=float)
+            with stage['predict'].time():
+                return self.predict(features), True
         except Exception as e:
-            print(f"Error in prediction: {e}")
-            scores = np.random.rand(len(applications))
-        
-        # Assign scores
-        for i, app in enumerate(applications):
-            app['rank_score'] = float(scores[i])
+            logger.error("Error in prediction: %s", e)
+            return np.random.rand(len(resume_texts)), False
+    
+    def rank_applications(self, applications, job_description, job_id=None, stored_counts=None):
+        """
+        Rank applications and assign categories
+        
+        When job_id is given, scores from the previous ranking of the same job
+        (and job description) are reused for applications whose id and resume
+        text are unchanged, so only new or changed applications are scored.
+        
+        stored_counts, aligned with applications, holds term counts from a
+        FeatureStore (or None) for each application; only the others are
+        tokenized.
+        """
+        if not applications:
+            return []
         
-        # Sort by score descending
-        ranked_applications = sorted(applications, key=lambda x: x['rank_score'], reverse=True)
-        all_scores = [app['rank_score'] for app in ranked_applications]
+        resume_texts = [app.get('resume_text') or '' for app in applications]
+        resume_counts = None
+        if stored_counts is not None and self.supports_stored_counts \
+                and any(counts is not None for counts in stored_counts):
+            with stage['vectorize'].time():
+                resume_counts = self.merge_counts(resume_texts, stored_counts)
+        
+        if job_id is None:
+            scores, _ = self.score_texts(resume_texts, job_description, resume_counts)
+            return self.assign_ranks(applications, scores)
+        
+        job_hash = hashlib.sha1(job_description.encode('utf-8')).hexdigest()
+        text_hashes = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in resume_texts]
+        previous = self.ranking_state.get(job_id, job_hash)
+        
+        scores = np.empty(len(applications), dtype=float)
+        stale = []
+        for i, (app, text_hash) in enumerate(zip(applications, text_hashes)):
+            known = previous.get(app['id'])
+            if known is not None and known[0] == text_hash:
+                scores[i] = known[1]
+            else:
+                stale.append(i)
+        
+        ok = True
+        if stale:
+            new_scores, ok = self.score_texts(
+                [resume_texts[i] for i in stale], job_description,
+                resume_counts[stale] if resume_counts is not None else None
+            )
+            scores[stale] = new_scores
+        logger.info("Scored %d of %d applications for job %s", len(stale), len(applications), job_id,
+                    extra={'job_id': job_id, 'scored': len(stale), 'applications': len(applications)})
+        
+        if ok:
+            self.ranking_state.put(job_id, job_hash, {
+                app['id']: (text_hash, score)
+                for app, text_hash, score in zip(applications, text_hashes, scores.tolist())
+            })
+        return self.assign_ranks(applications, scores)
+    
+    def rank_batch(self, groups):
+        """
+        Rank several jobs with a single model invocation
         
-        # Assign rank, category, and match percentage
-        for i, app in enumerate(ranked_applications):
-            app['rank'] = i + 1
-            app['match_category'] = self.categorize_score(app['rank_score'], all_scores)
-            app['match_percentage'] = round(max(0.0, min(app['rank_score'], 1.0)) * 100, 1)
+        Args:
+            groups: list of (applications, job_description) pairs
+            
+        Returns:
+            list of ranked application lists, one per group, each ranked
+            and categorized independently
+        """
+        resume_texts, job_index = [], []
+        for j, (applications, _) in enumerate(groups):
+            resume_texts.extend(app.get('resume_text') or '' for app in applications)
+            job_index.extend([j] * len(applications))
+        
+        if not resume_texts:
+            return [[] for _ in groups]
+        
+        job_descriptions = [job_description for _, job_description in groups]
+        with stage['vectorize'].time():
+            features = self.prepare_batch_features(resume_texts, job_descriptions, job_index)
         
-        return ranked_applications
+        try:
+            with stage['predict'].time():
+                scores = self.predict(features)
+        except Exception as e:
+            logger.error("Error in prediction: %s", e)
+            scores = np.random.rand(len(resume_texts))
+        
+        ranked_groups = []
+        offset = 0
+        for applications, _ in groups:
+            group_scores = scores[offset:offset + len(applications)]
+            offset += len(applications)
+            ranked_groups.append(self.assign_ranks(applications, group_scores) if applications else [])
+        return ranked_groups
+    
+    @staticmethod
+    def categorize_scores(scores):
+        """Vectorized categorize_score: one percentile pass for all scores"""
+        scores = np.asarray(scores, dtype=float)
+        if scores.size == 0:
+            return np.array([], dtype=object)
+        percentile_67, percentile_33 = np.percentile(scores, [67, 33])
+        return np.where(
+            scores >= percentile_67, "Best Match",
+            np.where(scores >= percentile_33, "Average Match", "Weak Match")
+        ).astype(object)
+    
+    def assign_ranks(self, applications, scores):
+        """
+        Sort applications by score and set rank_score, rank,
+        match_category and match_percentage on each of them
+        """
+        with stage['rank'].time():
+            scores = np.asarray(scores, dtype=float)
+            
+            # Stable descending sort, same tie order as sorted(..., reverse=True)
+            order = np.argsort(-scores, kind='stable')
+            sorted_scores = scores[order]
+            categories = self.categorize_scores(sorted_scores)
+            # Python's round, not np.round: the latter scales by 10 first and
+            # can land on the other side of a half-way value (12.35 -> 12.4)
+            percentages = [round(p, 1) for p in (np.clip(sorted_scores, 0.0, 1.0) * 100).tolist()]
+            
+            ranked_applications = [applications[i] for i in order.tolist()]
+            for rank, (app, score, category, percentage) in enumerate(zip(
+                ranked_applications, sorted_scores.tolist(), categories.tolist(), percentages
+            ), start=1):
+                app['rank_score'] = score
+                app['rank'] = rank
+                app['match_category'] = category
+                app['match_percentage'] = percentage
+            
+            return ranked_applications
     
     def get_category_summary(self, ranked_applications):
         """Get summary of applications by category"""
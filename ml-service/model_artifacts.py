@@ -0,0 +1,99 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import sklearn
+
+from tree_predictor import TreeEnsemblePredictor
+
+logger = logging.getLogger(__name__)
+
+
+def source_key(path, *extra):
+    """Content hash of a source artifact plus anything its cached form depends on"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    for item in extra:
+        digest.update(str(item).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+class ModelArtifactCache:
+    """
+    Precompiled forms of the ranking artifacts, for fast cold starts.
+
+    Each cached file is named after the hash of its source file (and the
+    library versions that produced it), so a retrained lightgbm_ranking.txt
+    or ranking.pkl is picked up automatically and rebuilt once.
+
+    - vectorizer: re-pickled with protocol 5 and without `stop_words_`,
+      which sklearn keeps only for introspection and which can be far larger
+      than the vocabulary itself
+    - tree predictor: compiled TreeEnsemblePredictor arrays as .npz, so the
+      model text does not have to be parsed again
+    """
+
+    def __init__(self, cache_dir='.model_cache'):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def load_vectorizer(self, vectorizer_path):
+        key = source_key(vectorizer_path, sklearn.__version__, np.__version__)
+        cached_path = os.path.join(self.cache_dir, f"vectorizer-{key}.pkl")
+
+        if os.path.exists(cached_path):
+            try:
+                with open(cached_path, 'rb') as f:
+                    return pickle.load(f)
+            except Exception as e:
+                logger.warning("Ignoring unreadable vectorizer cache %s: %s", cached_path, e)
+
+        with open(vectorizer_path, 'rb') as f:
+            vectorizer = pickle.load(f)
+        if hasattr(vectorizer, 'stop_words_'):
+            vectorizer.stop_words_ = None
+        self._write(cached_path, lambda f: pickle.dump(vectorizer, f, protocol=5))
+        return vectorizer
+
+    def load_tree_predictor(self, model_path):
+        key = source_key(model_path, np.__version__)
+        cached_path = os.path.join(self.cache_dir, f"trees-{key}.npz")
+
+        if os.path.exists(cached_path):
+            try:
+                return TreeEnsemblePredictor.load(cached_path)
+            except Exception as e:
+                logger.warning("Ignoring unreadable tree cache %s: %s", cached_path, e)
+
+        predictor = TreeEnsemblePredictor(model_path)
+        self._write(cached_path, predictor.save)
+        return predictor
+
+    def _write(self, path, write):
+        """Write atomically so concurrent workers never read a partial file"""
+        self._prune(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning("Could not write model cache %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _prune(self, path):
+        """Drop cached builds of older source versions of the same artifact"""
+        name = os.path.basename(path)
+        prefix = name.split('-', 1)[0] + '-'
+        for other in os.listdir(self.cache_dir):
+            if other.startswith(prefix) and other != name:
+                try:
+                    os.remove(os.path.join(self.cache_dir, other))
+                except OSError:
+                    pass
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ModelFileWatcher:
+    """
+    Polls model artifact files and calls `on_change` when they change.
+
+    A change is only reported once the files have kept the same size and
+    mtime for one full interval, so a retrained model that is still being
+    copied into place is not picked up half-written.
+    """
+
+    def __init__(self, paths, on_change, interval=30.0):
+        """
+        Args:
+            paths: Files to watch (model and vectorizer)
+            on_change: async callable invoked after a settled change
+            interval: Seconds between polls
+        """
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = interval
+        self._task = None
+
+    def signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        active = self.signature()
+        pending = None
+        while True:
+            await asyncio.sleep(self.interval)
+            current = self.signature()
+
+            if current == active or None in current:
+                pending = None
+                continue
+            if current != pending:
+                pending = current  # changed; wait one more interval to settle
+                continue
+
+            try:
+                await self.on_change()
+            except Exception as e:
+                logger.error("Model reload after file change failed: %s", e)
+            # Don't retry the same files in a loop; wait for the next change
+            active, pending = current, None
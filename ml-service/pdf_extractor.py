@@ -1,64 +1,338 @@
-import PyPDF2
-import requests
-from io import BytesIO
-import re
+import asyncio
+import logging
+import time
+
+from section_scanner import DEFAULT_SCANNER
+from spooled_body import SpooledBody
+from service_logging import PER_RESUME
+from service_metrics import (
+    RESUME_FETCH_FAILURES, RESUMES_FETCHED, RESUMES_TRUNCATED, cache_result, stage
+)
+from text_normalizer import RESUME_TEXT
+
+logger = logging.getLogger(__name__)
+
+class ExtractionLimits:
+    """Budget for extracting one PDF; None means no limit"""
+
+    __slots__ = ('max_pages', 'max_chars', 'max_seconds')
+
+    def __init__(self, max_pages=None, max_chars=None, max_seconds=None):
+        """
+        Args:
+            max_pages: Pages read at most
+            max_chars: Characters of text kept at most
+            max_seconds: Wall time after which no further page is read
+        """
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.max_seconds = max_seconds
+
+    def narrowed(self, other):
+        """The stricter of both limits per field (other may be None)"""
+        if other is None:
+            return self
+        return ExtractionLimits(*(
+            mine if theirs is None else theirs if mine is None else min(mine, theirs)
+            for mine, theirs in zip(self.as_tuple(), other.as_tuple())
+        ))
+
+    def as_tuple(self):
+        return self.max_pages, self.max_chars, self.max_seconds
+
+    def to_dict(self):
+        return dict(zip(self.__slots__, self.as_tuple()))
+
+
+class ExtractionResult:
+    """Text of one PDF and whether a limit cut it short"""
+
+    __slots__ = ('text', 'truncated', 'reason', 'pages_read', 'total_pages')
+
+    def __init__(self, text, truncated=False, reason=None, pages_read=None, total_pages=None):
+        """
+        Args:
+            text: Cleaned text
+            truncated: True when extraction stopped before the end of the document
+            reason: 'pages', 'chars', 'time' or 'timeout' when truncated
+            pages_read: Pages whose text was extracted (None if unknown, e.g. cached)
+            total_pages: Pages in the document (None if unknown)
+        """
+        self.text = text
+        self.truncated = truncated
+        self.reason = reason
+        self.pages_read = pages_read
+        self.total_pages = total_pages
+
+    def within(self, limits):
+        """This result cut to limits.max_chars (for text that was not parsed under them)"""
+        if limits is None or limits.max_chars is None or len(self.text) <= limits.max_chars:
+            return self
+        return ExtractionResult(self.text[:limits.max_chars].rstrip(), True, 'chars',
+                                self.pages_read, self.total_pages)
+
 
 class PDFTextExtractor:
     """Extract text from PDF files"""
     
-    @staticmethod
-    def extract_from_url(pdf_url):
+    def __init__(self, cache=None, parse_pool=None, section_scanner=None, limits=None):
+        """
+        Args:
+            cache: Optional ResumeTextCache shared across requests
+            parse_pool: Optional started PDFParsePool used by the async path
+            section_scanner: Optional SectionScanner for extract_key_sections callers
+            limits: ExtractionLimits applied to every document; per-request
+                limits can only narrow them
+        """
+        self.cache = cache
+        self.parse_pool = parse_pool
+        self.section_scanner = section_scanner
+        self.limits = limits or ExtractionLimits()
+    
+    def extract_from_url(self, pdf_url, limits=None):
         """
         Extract text from PDF URL (e.g., Cloudinary URL)
         
         Args:
             pdf_url: URL of the PDF file
+            limits: Optional per-request ExtractionLimits
             
         Returns:
             Extracted text as string
         """
+        limits = self.limits.narrowed(limits)
         try:
-            # Download PDF from URL
-            print(f"Downloading PDF from: {pdf_url}")
-            response = requests.get(pdf_url, timeout=30)
-            response.raise_for_status()
+            entry = self.cache.get(pdf_url) if self.cache else None
+            if entry is not None and self.cache.is_fresh(entry):
+                return ExtractionResult(entry.text).within(limits).text
+            
+            import requests
             
-            # Read PDF from bytes
-            pdf_file = BytesIO(response.content)
-            return PDFTextExtractor.extract_from_file(pdf_file)
+            # Download PDF from URL (conditionally if we hold a cached copy)
+            logger.debug("Downloading PDF", extra={'url': pdf_url, **PER_RESUME})
+            headers = entry.conditional_headers() if entry is not None else {}
+            with requests.get(pdf_url, headers=headers, timeout=30, stream=True) as response, \
+                    SpooledBody() as body:
+                if entry is not None and response.status_code == 304:
+                    self.cache.mark_revalidated(entry)
+                    return ExtractionResult(entry.text).within(limits).text
+                response.raise_for_status()
+                
+                # Streamed in chunks, size-capped and spooled to disk when large
+                body.check_length(response.headers.get('Content-Length'))
+                for chunk in response.iter_content(64 * 1024):
+                    body.write(chunk)
+                body.finish()
+                
+                return self.extract_from_body(
+                    body,
+                    url=pdf_url,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                    limits=limits
+                ).text
             
         except Exception as e:
-            print(f"Error extracting text from URL {pdf_url}: {e}")
+            logger.warning("Error extracting text from URL: %s", e, extra={'url': pdf_url, **PER_RESUME})
             return ""
     
+    async def extract_from_url_async(self, pdf_url, fetcher, limits=None):
+        """
+        Async variant of extract_from_url for use inside request handlers.
+        Downloads through a shared ResumeFetcher and parses off the event loop.
+        
+        Args:
+            pdf_url: URL of the PDF file
+            fetcher: Started ResumeFetcher
+            limits: Optional per-request ExtractionLimits
+            
+        Returns:
+            Extracted text as string
+        """
+        return (await self.extract_result_from_url_async(pdf_url, fetcher, limits)).text
+    
+    async def extract_result_from_url_async(self, pdf_url, fetcher, limits=None):
+        """extract_from_url_async returning the full ExtractionResult"""
+        limits = self.limits.narrowed(limits)
+        try:
+            # Cache calls hit SQLite: keep them off the event loop
+            entry = await asyncio.to_thread(self.cache.get, pdf_url) if self.cache else None
+            if entry is not None and self.cache.is_fresh(entry):
+                cache_result['fresh'].inc()
+                return ExtractionResult(entry.text).within(limits)
+            
+            headers = entry.conditional_headers() if entry is not None else {}
+            try:
+                with stage['download'].time():
+                    result = await fetcher.fetch(pdf_url, headers=headers)
+            except Exception:
+                RESUME_FETCH_FAILURES.inc()
+                raise
+            RESUMES_FETCHED.inc()
+            with result:
+                if entry is not None and result.not_modified:
+                    await asyncio.to_thread(self.cache.mark_revalidated, entry)
+                    cache_result['revalidated'].inc()
+                    return ExtractionResult(entry.text).within(limits)
+                
+                return await self.extract_from_body_async(
+                    result.body,
+                    url=pdf_url,
+                    etag=result.headers.get('ETag'),
+                    last_modified=result.headers.get('Last-Modified'),
+                    limits=limits
+                )
+            
+        except Exception as e:
+            logger.warning("Error extracting text from URL: %s", e, extra={'url': pdf_url, **PER_RESUME})
+            return ExtractionResult("")
+    
+    def extract_from_bytes(self, content, url=None, etag=None, last_modified=None, limits=None):
+        """
+        Extract text from downloaded PDF bytes, reusing cached text
+        when the same content has been parsed before
+        
+        Args:
+            content: Raw PDF bytes
+            url: Source URL, recorded in the cache index when given
+            etag: ETag response header, used for later revalidation
+            last_modified: Last-Modified response header
+            limits: ExtractionLimits for this document (None: no limit)
+            
+        Returns:
+            ExtractionResult
+        """
+        return self.extract_from_body(SpooledBody.from_bytes(content), url, etag, last_modified, limits)
+    
+    def extract_from_body(self, body, url=None, etag=None, last_modified=None, limits=None):
+        """extract_from_bytes for a downloaded SpooledBody, read in place"""
+        content_hash, text = self._cached_text(body.content_hash)
+        if text is not None:
+            # Still index this URL (and its validators) under these bytes
+            self._store(url, content_hash, ExtractionResult(text), etag, last_modified)
+            return ExtractionResult(text).within(limits)
+        result = PDFTextExtractor.extract_pages(body.reader(), limits)
+        self._store(url, content_hash, result, etag, last_modified)
+        return result
+    
+    async def extract_from_bytes_async(self, content, url=None, etag=None, last_modified=None, limits=None):
+        """Async variant of extract_from_bytes"""
+        return await self.extract_from_body_async(
+            SpooledBody.from_bytes(content), url, etag, last_modified, limits
+        )
+    
+    async def extract_from_body_async(self, body, url=None, etag=None, last_modified=None, limits=None):
+        """
+        Async variant of extract_from_body. Parses in the process pool
+        when one is configured (a spooled body is passed by file path, not
+        copied), otherwise in a worker thread.
+        """
+        content_hash, text = await asyncio.to_thread(self._cached_text, body.content_hash)
+        if text is not None:
+            cache_result['content'].inc()
+            # Still index this URL (and its validators) under these bytes
+            await asyncio.to_thread(self._store, url, content_hash, ExtractionResult(text), etag, last_modified)
+            return ExtractionResult(text).within(limits)
+        
+        cache_result['miss'].inc()
+        with stage['parse'].time():
+            if self.parse_pool is not None:
+                # The worker reads a spooled body from disk: flush it first
+                result = await self.parse_pool.parse(body.finish().path or body.getvalue(), limits)
+            else:
+                result = await asyncio.to_thread(PDFTextExtractor.extract_pages, body.reader(), limits)
+        if result.truncated:
+            RESUMES_TRUNCATED.labels(result.reason).inc()
+            logger.info("Resume truncated (%s limit) after %s of %s pages", result.reason,
+                        result.pages_read, result.total_pages, extra={'url': url, **PER_RESUME})
+        await asyncio.to_thread(self._store, url, content_hash, result, etag, last_modified)
+        return result
+    
+    def _cached_text(self, content_hash):
+        if self.cache is None:
+            return None, None
+        return content_hash, self.cache.get_text(content_hash)
+    
+    def _store(self, url, content_hash, result, etag, last_modified):
+        # Empty output may come from a transient failure and truncated output
+        # depends on the limits it was parsed under; don't pin either
+        if self.cache is not None and result.text and not result.truncated and url:
+            self.cache.put(url, content_hash, result.text, etag, last_modified)
+    
     @staticmethod
-    def extract_from_file(pdf_file):
+    def extract_from_file(pdf_file, limits=None):
         """
         Extract text from PDF file object
         
         Args:
             pdf_file: File-like object containing PDF data
+            limits: Optional ExtractionLimits
             
         Returns:
             Extracted text as string
         """
+        return PDFTextExtractor.extract_pages(pdf_file, limits).text
+    
+    @staticmethod
+    def extract_pages(pdf_file, limits=None):
+        """
+        Extract text page by page, stopping at the first limit reached
+        
+        Args:
+            pdf_file: File-like object containing PDF data
+            limits: Optional ExtractionLimits
+            
+        Returns:
+            ExtractionResult ("" text if the document could not be read)
+        """
+        max_pages, max_chars, max_seconds = limits.as_tuple() if limits else (None, None, None)
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        # Page texts are joined once at the end
+        parts = []
+        pages_read = 0
+        total_pages = None
         try:
+            import PyPDF2  # imported on first use to keep service start-up light
+            
             pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
+            pages = pdf_reader.pages
+            total_pages = len(pages)
             
-            # Extract text from all pages
-            for page in pdf_reader.pages:
+            chars = 0
+            reason = None
+            for page in pages:
+                if max_pages is not None and pages_read >= max_pages:
+                    reason = 'pages'
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    reason = 'time'
+                    break
+                if max_chars is not None and chars >= max_chars:
+                    reason = 'chars'
+                    break
                 page_text = page.extract_text()
+                pages_read += 1
                 if page_text:
-                    text += page_text + "\n"
+                    parts.append(page_text)
+                    chars += len(page_text) + 1
+            
+            text = "\n".join(parts)
+            if max_chars is not None and len(text) > max_chars:
+                text = text[:max_chars]
+                reason = reason or 'chars'
             
             # Clean up text
             text = PDFTextExtractor.clean_text(text)
-            return text
+            return ExtractionResult(text, reason is not None, reason, pages_read, total_pages)
             
+        except TimeoutError:
+            # Hard per-document timeout of a parse worker (see pdf_parse_pool):
+            # keep the pages read so far, marked as cut short
+            text = PDFTextExtractor.clean_text("\n".join(parts))
+            return ExtractionResult(text, True, 'timeout', pages_read, total_pages)
         except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
-            return ""
+            logger.warning("Error extracting text from PDF: %s", e, extra=PER_RESUME)
+            return ExtractionResult("")
     
     @staticmethod
     def clean_text(text):
@@ -66,66 +340,20 @@ class PDFTextExtractor:
         if not text:
             return ""
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters but keep important ones
-        text = re.sub(r'[^\w\s\.\,\@\-\+\#\(\)]', ' ', text)
-        # Remove extra spaces
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # Keep word characters and .,@-+#(), collapse whitespace (one pass)
+        return RESUME_TEXT.normalize(text)
     
     @staticmethod
-    def extract_key_sections(text):
+    def extract_key_sections(text, scanner=None):
         """
         Extract key sections from resume text
         Returns a dict with sections
-        """
-        sections = {
-            'skills': '',
-            'experience': '',
-            'education': '',
-            'full_text': text
-        }
-        
-        if not text:
-            return sections
-        
-        text_lower = text.lower()
-        
-        # Extract skills section
-        skills_patterns = [
-            r'skills?[\s:]*(.{0,500}?)(?:experience|education|projects|$)',
-            r'technical\s+skills?[\s:]*(.{0,500}?)(?:experience|education|$)',
-        ]
-        for pattern in skills_patterns:
-            skills_match = re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            if skills_match:
-                sections['skills'] = skills_match.group(1).strip()
-                break
         
-        # Extract experience section
-        exp_patterns = [
-            r'(?:work\s+)?experience[\s:]*(.{0,1000}?)(?:education|skills|projects|$)',
-            r'professional\s+experience[\s:]*(.{0,1000}?)(?:education|skills|$)',
-        ]
-        for pattern in exp_patterns:
-            exp_match = re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            if exp_match:
-                sections['experience'] = exp_match.group(1).strip()
-                break
-        
-        # Extract education section
-        edu_patterns = [
-            r'education[\s:]*(.{0,500}?)(?:experience|skills|projects|$)',
-            r'academic\s+background[\s:]*(.{0,500}?)(?:experience|skills|$)',
-        ]
-        for pattern in edu_patterns:
-            edu_match = re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL)
-            if edu_match:
-                sections['education'] = edu_match.group(1).strip()
-                break
-        
-        return sections
+        Args:
+            text: Resume text
+            scanner: Optional SectionScanner with extra headers (default sections otherwise)
+        """
+        return (scanner or DEFAULT_SCANNER).scan(text)
 
 
 # Test the extractor
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from pdf_extractor import ExtractionResult, PDFTextExtractor
+from service_logging import configure_worker_logging
+
+logger = logging.getLogger(__name__)
+
+
+# PyPDF2 catches and logs some exceptions while walking a document, which
+# can swallow the alarm; it keeps firing at this interval until it unwinds
+ALARM_REPEAT = 0.05
+
+_alarm_fired = False
+
+
+def _on_alarm(signum, frame):
+    global _alarm_fired
+    _alarm_fired = True
+    raise TimeoutError("PDF parsing exceeded time limit")
+
+
+def _parse_pdf(source, timeout, limits=None):
+    """Worker entry point: PDF bytes (or the path of a spooled download) in, ExtractionResult out"""
+    global _alarm_fired
+    _alarm_fired = False
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout, ALARM_REPEAT)
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as pdf_file:
+                result = PDFTextExtractor.extract_pages(pdf_file, limits)
+        else:
+            result = PDFTextExtractor.extract_pages(BytesIO(source), limits)
+        if _alarm_fired and result.reason != 'timeout':
+            # The timeout surfaced as a generic parse error or was swallowed
+            result = ExtractionResult(result.text, True, 'timeout', result.pages_read, result.total_pages)
+        return result
+    except TimeoutError:
+        # The alarm fired outside extract_pages' own handler (e.g. opening
+        # the file); never let it reach the pool, where it would read as
+        # an unresponsive worker
+        return ExtractionResult("", truncated=True, reason='timeout')
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class PDFParsePool:
+    """
+    Process pool that runs PyPDF2 parsing outside the GIL of the web process.
+
+    Workers are recycled after max_tasks_per_child documents to cap memory
+    growth. Each document gets `timeout` seconds: inside the worker a timer
+    interrupts the parse, and if a worker still does not answer within the
+    grace period the whole pool is torn down and replaced.
+    """
+
+    def __init__(self, workers=None, max_tasks_per_child=100, timeout=20.0, grace=5.0):
+        """
+        Args:
+            workers: Number of worker processes (defaults to CPU count)
+            max_tasks_per_child: Documents parsed before a worker is replaced
+            timeout: Seconds allowed per document
+            grace: Extra seconds before a silent worker is killed
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.grace = grace
+
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._stats = {'parsed': 0, 'timeouts': 0, 'restarts': 0}
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(self, source, limits=None):
+        """
+        Parse a PDF in a worker process
+
+        Args:
+            source: Raw PDF bytes, or the path of a file the worker reads
+                itself (large downloads are not pickled through the pipe)
+            limits: Optional ExtractionLimits; max_seconds is a soft budget
+                checked between pages, `timeout` still applies on top
+
+        Returns:
+            ExtractionResult ("" text if the document failed or timed out)
+        """
+        if self._executor is None:
+            raise RuntimeError("PDFParsePool is not started")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        # Only hand the executor as many documents as there are workers, so
+        # the deadline below measures parse time rather than queue time
+        async with self._slots:
+            executor = self._executor
+            future = executor.submit(_parse_pdf, source, self.timeout, limits)
+            try:
+                result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout + self.grace)
+                self._stats['parsed'] += 1
+                if result.reason == 'timeout':
+                    self._stats['timeouts'] += 1  # stopped by the in-worker timer
+                return result
+            except asyncio.TimeoutError:
+                logger.error("PDF parse worker unresponsive after %.0fs, restarting pool",
+                             self.timeout + self.grace)
+                self._stats['timeouts'] += 1
+                self._restart(executor)
+                return ExtractionResult("", truncated=True, reason='timeout')
+            except BrokenProcessPool:
+                logger.error("PDF parse pool broken, restarting")
+                self._restart(executor)
+                return ExtractionResult("")
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats['workers'] = self.workers
+        return stats
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=self.max_tasks_per_child,
+            initializer=configure_worker_logging
+        )
+
+    def _restart(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return  # another request already replaced it
+            self._executor = self._new_executor()
+            self._stats['restarts'] += 1
+
+        # Kill the old workers so a stuck parse cannot keep a core busy
+        for process in list((broken._processes or {}).values()):
+            process.terminate()
+        broken.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,171 @@
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from text_normalizer import WORD_TEXT
+
+
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+WORD_TOKEN = re.compile(r"\w\w+")
+
+
+def _trie_pattern(terms):
+    """
+    Regex alternation of `terms` factored into a prefix trie, e.g.
+    ['java', 'javascript', 'sql'] -> 'java(?:script)?|sql'
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def pattern(node):
+        terminal = '' in node
+        branches = [re.escape(char) + pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 and len(branches[0]) == 1 \
+            else '(?:' + '|'.join(branches) + ')'
+        return body + '?' if terminal else body
+
+    return pattern(trie)
+
+
+class PrunedVectorizer:
+    """
+    Fitted word-unigram Count/TfidfVectorizer cut down to the terms the model
+    actually reads.
+
+    Only the first num_features vocabulary columns reach the model, so the
+    documents are scanned with one precompiled regex that matches just the
+    terms needed: every other token is skipped by the regex engine without
+    creating a string for it. When the tf-idf rows are normalized, the norm
+    still depends on every vocabulary term; those terms are then counted as
+    well and kept as extra columns after num_features, so values are
+    identical to the original vectorizer's first num_features columns (with
+    less of a speedup, since nothing can be skipped).
+    """
+
+    def __init__(self, vectorizer, num_features):
+        """
+        Args:
+            vectorizer: Fitted CountVectorizer/TfidfVectorizer (see supports)
+            num_features: Number of leading vocabulary columns the model uses
+        """
+        tfidf = getattr(vectorizer, '_tfidf', None)
+        self.binary = vectorizer.binary
+        self.dtype = vectorizer.dtype
+        self.norm = tfidf.norm if tfidf is not None else None
+        self.sublinear_tf = bool(tfidf is not None and tfidf.sublinear_tf)
+
+        vocabulary = vectorizer.vocabulary_
+        stop_words = vectorizer.get_stop_words() or ()
+        kept = {term: column for term, column in vocabulary.items()
+                if column < num_features and term not in stop_words}
+        self.columns = dict(kept)
+        self.n_features = max(kept.values(), default=-1) + 1
+
+        # Normalization needs every term's weight, not only the model's
+        if self.norm and len(vocabulary) > len(kept):
+            if num_features <= len(vocabulary) and set(stop_words).isdisjoint(vocabulary):
+                # Every term then keeps its fitted column: share the fitted
+                # dict rather than holding a second copy of the vocabulary
+                self.columns = vocabulary
+                self.n_features = len(vocabulary)
+            else:
+                extra = sorted((column, term) for term, column in vocabulary.items()
+                               if term not in kept and term not in stop_words)
+                self.n_features = max(self.n_features, num_features)
+                for offset, (_, term) in enumerate(extra):
+                    self.columns[term] = self.n_features + offset
+                self.n_features += len(extra)
+
+        self.idf = None
+        if tfidf is not None and tfidf.use_idf and self.columns is vocabulary:
+            self.idf = np.asarray(tfidf.idf_, dtype=np.float64)
+        elif tfidf is not None and tfidf.use_idf:
+            source_column = {column: vocabulary[term] for term, column in self.columns.items()}
+            self.idf = np.ones(self.n_features, dtype=np.float64)
+            for column, original in source_column.items():
+                self.idf[column] = tfidf.idf_[original]
+
+        # A trie of the needed terms pays off when it skips part of the
+        # vocabulary; when every term is needed, the translate-based
+        # WORD_TEXT tokenizer is faster than any regex scan
+        self.pruned = len(self.columns) < len(vocabulary)
+        if self.pruned:
+            self.pattern = re.compile(r"(?u)\b(?:" + _trie_pattern(self.columns) + r")\b") \
+                if self.columns else None
+        else:
+            self.pattern = None
+
+    @staticmethod
+    def supports(vectorizer):
+        """
+        Whether the regex scan reproduces the vectorizer's tokenization:
+        default word tokenizer, lowercasing, no custom hooks, unigrams
+        """
+        return (
+            isinstance(vectorizer, CountVectorizer)
+            and vectorizer.analyzer == 'word'
+            and tuple(vectorizer.ngram_range) == (1, 1)
+            and vectorizer.token_pattern == DEFAULT_TOKEN_PATTERN
+            and vectorizer.lowercase
+            and vectorizer.input == 'content'
+            and vectorizer.tokenizer is None
+            and vectorizer.preprocessor is None
+            and vectorizer.strip_accents is None
+            and hasattr(vectorizer, 'vocabulary_')
+            and all(WORD_TOKEN.fullmatch(term) for term in vectorizer.vocabulary_)
+        )
+
+    def count_terms(self, texts):
+        """Term counts over the pruned columns, as CSR"""
+        indptr, indices, values = array('q', [0]), array('i'), array('q')
+        columns = self.columns
+        for text in texts:
+            if self.pruned:
+                tokens = self.pattern.findall(text.lower()) if self.pattern is not None else ()
+            else:
+                tokens = WORD_TEXT.tokens(text)
+            if tokens:
+                for term, count in Counter(tokens).items():
+                    column = columns.get(term)
+                    if column is not None:
+                        indices.append(column)
+                        values.append(count)
+            indptr.append(len(indices))
+
+        counts = sparse.csr_matrix(
+            (np.frombuffer(values, dtype=np.int64).astype(self.dtype),
+             np.frombuffer(indices, dtype=np.int32),
+             np.frombuffer(indptr, dtype=np.int64)),
+            shape=(len(texts), self.n_features)
+        )
+        counts.sort_indices()
+        if self.binary:
+            counts.data[:] = 1
+        return counts
+
+    def counts_to_tfidf(self, counts, copy=True):
+        """Same steps as the fitted TfidfTransformer.transform(counts)"""
+        X = sparse.csr_matrix(counts, dtype=np.float64, copy=copy)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def transform(self, texts):
+        return self.counts_to_tfidf(self.count_terms(texts), copy=False)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RankingJob:
+    """A /rank request processed in the background"""
+
+    def __init__(self, request, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.callback_url = callback_url
+        self.status = 'queued'  # queued -> running -> completed | failed
+        self.progress = {'extracted': 0, 'total': len(request.applications)}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class RankingJobManager:
+    """
+    Queue plus background workers for long ranking jobs.
+
+    `runner` is a coroutine function taking a RankingJob; it updates
+    job.progress and returns the result. Finished jobs are kept for `ttl`
+    seconds and, if a callback URL was given, POSTed there once, from a
+    separate task so a slow callback does not hold up the next job.
+    """
+
+    def __init__(self, runner, workers=2, max_pending=100, ttl=3600, callback_timeout=10.0,
+                 callback_hosts=()):
+        """
+        Args:
+            runner: async def runner(job) -> result
+            workers: Number of jobs processed concurrently
+            max_pending: Queued jobs accepted before submit() refuses more
+            ttl: Seconds a finished job (and its result) is kept
+            callback_timeout: Timeout for completion callbacks
+            callback_hosts: Host names callbacks may be sent to without
+                further authorization (see callback_allowed)
+        """
+        self.runner = runner
+        self.workers = workers
+        self.ttl = ttl
+        self.callback_timeout = callback_timeout
+        self.callback_hosts = frozenset(host.strip().lower() for host in callback_hosts if host.strip())
+
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._jobs = {}
+        self._tasks = []
+        self._callbacks = set()
+        self._client = None
+
+    async def start(self):
+        self._client = httpx.AsyncClient(timeout=self.callback_timeout)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        tasks = self._tasks + list(self._callbacks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._callbacks.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def submit(self, request, callback_url=None):
+        """
+        Queue a ranking request
+
+        Raises:
+            asyncio.QueueFull: if max_pending jobs are already waiting
+        """
+        self._purge_expired()
+        job = RankingJob(request, callback_url)
+        self._queue.put_nowait(job)
+        self._jobs[job.id] = job
+        return job
+
+    def callback_allowed(self, url):
+        """Whether url is an http(s) URL on one of callback_hosts"""
+        parts = urlsplit(url)
+        return parts.scheme in ('http', 'https') and (parts.hostname or '') in self.callback_hosts
+
+    def get(self, job_id):
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    def stats(self):
+        counts = {'queued': 0, 'running': 0, 'completed': 0, 'failed': 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                job.status = 'running'
+                job.result = await self.runner(job)
+                job.status = 'completed'
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ranking job %s failed: %s", job.id, e)
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                job.request = None  # inputs are no longer needed
+                self._queue.task_done()
+
+            if job.callback_url:
+                task = asyncio.create_task(self._send_callback(job))
+                self._callbacks.add(task)
+                task.add_done_callback(self._callbacks.discard)
+
+    async def _send_callback(self, job):
+        try:
+            response = await self._client.post(job.callback_url, json=job.to_dict())
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning("Callback for ranking job %s to %s failed: %s", job.id, job.callback_url, e)
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class JobRankingState:
+    """Scores of one job's applications for one job description"""
+
+    __slots__ = ('job_description_hash', 'scores', 'updated_at')
+
+    def __init__(self, job_description_hash):
+        self.job_description_hash = job_description_hash
+        self.scores = {}  # application id -> (resume text hash, score)
+        self.updated_at = time.time()
+
+
+class RankingStateStore:
+    """
+    Per-job memory of already scored applications.
+
+    Lets a re-rank of the same job score only applications that are new or
+    whose resume text changed. State is dropped when the job description
+    changes, after `ttl` seconds without use, or when more than `max_jobs`
+    jobs are tracked (least recently used first).
+    """
+
+    def __init__(self, max_jobs=1000, ttl=24 * 3600):
+        """
+        Args:
+            max_jobs: Number of jobs whose scores are remembered
+            ttl: Seconds a job's scores are kept without being re-ranked
+        """
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id, job_description_hash):
+        """Return a copy of the stored scores for a job, or an empty dict"""
+        with self._lock:
+            state = self._jobs.get(job_id)
+            if state is None:
+                return {}
+            if state.job_description_hash != job_description_hash or \
+                    time.time() - state.updated_at > self.ttl:
+                del self._jobs[job_id]
+                return {}
+            self._jobs.move_to_end(job_id)
+            return dict(state.scores)
+
+    def put(self, job_id, job_description_hash, scores):
+        """Replace the stored scores of a job"""
+        state = JobRankingState(job_description_hash)
+        state.scores = scores
+        with self._lock:
+            self._jobs[job_id] = state
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._jobs.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'jobs': len(self._jobs),
+                'applications': sum(len(state.scores) for state in self._jobs.values()),
+            }
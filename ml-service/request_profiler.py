@@ -0,0 +1,224 @@
+import contextvars
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+
+# The RequestProfile of the request being handled, if it opted in
+current_profile = contextvars.ContextVar('current_profile', default=None)
+
+# cProfile hooks the whole thread; only one request at a time may own the event loop's
+_loop_profiler_busy = threading.Lock()
+
+
+class RequestProfile:
+    """
+    Timings (and optionally a cProfile profile) of a single opted-in request.
+
+    Entered around the request handler, it becomes the current_profile, so
+    the pipeline's stage timers add their durations to it and inference
+    calls are profiled on their worker thread. Stages that run concurrently
+    (downloads, parses) are summed over all resumes of the request.
+
+    The event-loop part of the profile sees everything that runs on the
+    loop meanwhile, including other requests; PDF parsing in the process
+    pool only shows up in the stage timings.
+    """
+
+    def __init__(self, deterministic=True):
+        """
+        Args:
+            deterministic: Also record a cProfile profile, not just stage timings
+        """
+        self.deterministic = deterministic
+        self.stages = {}
+        self.started = None
+        self.total = None
+        self.skipped_reason = None
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._loop_profiler = None
+        self._token = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self._token = current_profile.set(self)
+        if self.deterministic:
+            if _loop_profiler_busy.acquire(blocking=False):
+                self._loop_profiler = cProfile.Profile()
+                self._loop_profiler.enable()
+            else:
+                self.skipped_reason = "another request is being profiled"
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        current_profile.reset(self._token)
+        return False
+
+    def finish(self):
+        """Stop the clock and the event-loop profiler (idempotent)"""
+        if self.total is not None:
+            return
+        self.total = time.perf_counter() - self.started
+        if self._loop_profiler is not None:
+            self._loop_profiler.disable()
+            self._add_profile(self._loop_profiler)
+            self._loop_profiler = None
+            _loop_profiler_busy.release()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn on the current (worker) thread, profiling it if deterministic"""
+        if not self.deterministic or self.skipped_reason or self.total is not None:
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            self._add_profile(profiler)
+
+    def _add_profile(self, profiler):
+        with self._lock:
+            self._profiles.append(profiler)
+
+    def server_timing(self):
+        """Server-Timing header value, durations in milliseconds"""
+        with self._lock:
+            entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        if self.total is not None:
+            entries.append(f"total;dur={self.total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def stats(self):
+        """Merged pstats.Stats of every profiled thread, or None"""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles on disk for download"""
+
+    ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, directory='.profiles', keep=20):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, profile):
+        """Write the profile's pstats dump; returns its id, or None if nothing was profiled"""
+        stats = profile.stats()
+        if stats is None:
+            return None
+        profile_id = uuid.uuid4().hex
+        os.makedirs(self.directory, exist_ok=True)
+        stats.dump_stats(self.path(profile_id))
+        self._prune()
+        return profile_id
+
+    def path(self, profile_id):
+        if not self.ID_PATTERN.match(profile_id):
+            raise ValueError("Invalid profile id")
+        return os.path.join(self.directory, f"{profile_id}.prof")
+
+    def report(self, profile_id, sort='cumulative', limit=60):
+        """Human-readable top functions of a stored profile"""
+        out = io.StringIO()
+        stats = pstats.Stats(self.path(profile_id), stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def _prune(self):
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.prof')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in profiles[self.keep:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests to `paths` which ask for it with
+    an `X-Profile` header or `profile` query parameter: "timing" for the
+    Server-Timing header only, any other value for a cProfile profile too.
+
+    Opted-in requests must pass `authorize(headers)`, which returns None or
+    an (HTTP status, message) rejection. The response gets Server-Timing and,
+    when a profile was stored, X-Profile-Id. Other requests go straight
+    through without any extra work beyond the path check.
+    """
+
+    def __init__(self, app, paths, store, authorize):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.store = store
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                   for name, value in scope['headers']}
+        mode = headers.get('x-profile') or self._query_flag(scope.get('query_string', b''))
+        if not mode or mode.lower() in ('0', 'false', 'no'):
+            return await self.app(scope, receive, send)
+
+        rejection = self.authorize(headers)
+        if rejection is not None:
+            status, message = rejection
+            return await self._reject(send, status, message)
+
+        profile = RequestProfile(deterministic=mode.lower() != 'timing')
+
+        async def send_with_timings(message):
+            if message['type'] == 'http.response.start':
+                profile.finish()
+                extra = [(b'server-timing', profile.server_timing().encode('latin-1'))]
+                profile_id = self.store.save(profile) if profile.deterministic else None
+                if profile_id:
+                    extra.append((b'x-profile-id', profile_id.encode('latin-1')))
+                if profile.skipped_reason:
+                    extra.append((b'x-profile-skipped', profile.skipped_reason.encode('latin-1')))
+                message = {**message, 'headers': list(message.get('headers', [])) + extra}
+            await send(message)
+
+        with profile:
+            await self.app(scope, receive, send_with_timings)
+
+    @staticmethod
+    def _query_flag(query_string):
+        match = re.search(rb'(?:^|&)profile=([^&]*)', query_string)
+        return match.group(1).decode('latin-1') if match else None
+
+    @staticmethod
+    async def _reject(send, status, message):
+        body = ('{"detail": "%s"}' % message).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('latin-1'))]
+        })
+        await send({'type': 'http.response.body', 'body': body})
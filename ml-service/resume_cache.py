@@ -0,0 +1,315 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    """Cached extraction result for a single resume URL"""
+
+    __slots__ = ('url', 'content_hash', 'text', 'etag', 'last_modified', 'validated_at')
+
+    def __init__(self, url, content_hash, text, etag=None, last_modified=None, validated_at=0.0):
+        self.url = url
+        self.content_hash = content_hash
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = validated_at
+
+    def conditional_headers(self):
+        """HTTP headers used to revalidate this entry with the origin"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def with_text(self, text):
+        """Copy of this entry carrying `text`"""
+        return CacheEntry(self.url, self.content_hash, text, self.etag,
+                          self.last_modified, self.validated_at)
+
+
+class ResumeTextCache:
+    """
+    Two-tier cache for extracted resume text.
+
+    Text is stored content-addressed (by SHA-256 of the PDF bytes) so the same
+    file uploaded under several URLs is parsed once. A URL index maps each
+    resume URL to its content hash plus the ETag / Last-Modified validators
+    needed for conditional re-downloads.
+
+    Tier 1 is an in-process LRU, tier 2 is a SQLite file that survives restarts.
+    Only the content-hash map of tier 1 holds text; its URL index keeps the
+    validators, so at most memory_entries texts are held in memory.
+    """
+
+    # Puts between re-reads of the exact disk size, which other worker
+    # processes sharing the file also change
+    RESYNC_EVERY = 256
+
+    def __init__(self, cache_dir='.resume_cache', memory_entries=512,
+                 max_disk_bytes=256 * 1024 * 1024, max_age=7 * 24 * 3600,
+                 fresh_for=300):
+        """
+        Args:
+            cache_dir: Directory for the on-disk store (None for memory only)
+            memory_entries: Max number of texts kept in the in-process LRU
+            max_disk_bytes: Total text bytes kept on disk before LRU eviction
+            max_age: Seconds after which an entry is evicted regardless of use
+            fresh_for: Seconds an entry is trusted without revalidating the URL
+        """
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self.fresh_for = fresh_for
+
+        self._lock = threading.Lock()
+        self._urls = OrderedDict()   # url -> CacheEntry (text is None)
+        self._texts = OrderedDict()  # content_hash -> (text, created_at)
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'revalidated': 0,
+            'content_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+        self._db = None
+        self._disk_bytes = 0
+        self._puts_since_resync = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, 'resume_text.sqlite3'),
+                check_same_thread=False
+            )
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS urls (
+                    url TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    validated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS texts (
+                    content_hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS texts_accessed ON texts (accessed_at);
+                CREATE INDEX IF NOT EXISTS texts_created ON texts (created_at);
+            """)
+            self._resync_disk_bytes()
+            self._evict_disk(time.time())
+
+    @staticmethod
+    def content_hash(content):
+        """Stable content address for raw PDF bytes"""
+        return hashlib.sha256(content).hexdigest()
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def get(self, url):
+        """Return the CacheEntry for a URL, or None if it is not cached"""
+        now = time.time()
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is not None:
+                text = self._memory_text(entry.content_hash, now)
+                if text is not None:
+                    self._urls.move_to_end(url)
+                    self._stats['memory_hits'] += 1
+                    return entry.with_text(text)
+                self._urls.pop(url, None)
+
+            if self._db is None:
+                self._stats['misses'] += 1
+                return None
+
+            row = self._db.execute(
+                "SELECT u.content_hash, u.etag, u.last_modified, u.validated_at, t.text, t.created_at "
+                "FROM urls u JOIN texts t ON t.content_hash = u.content_hash WHERE u.url = ?",
+                (url,)
+            ).fetchone()
+            if row is None or now - row[5] > self.max_age:
+                self._stats['misses'] += 1
+                return None
+
+            content_hash, etag, last_modified, validated_at, text, created_at = row
+            self._db.execute(
+                "UPDATE texts SET accessed_at = ? WHERE content_hash = ?", (now, content_hash)
+            )
+            self._db.commit()
+            entry = CacheEntry(url, content_hash, text, etag, last_modified, validated_at)
+            self._remember(entry, created_at)
+            self._stats['disk_hits'] += 1
+            return entry
+
+    def get_text(self, content_hash):
+        """Return cached text for already-downloaded PDF bytes, or None"""
+        with self._lock:
+            text = self._memory_text(content_hash, time.time())
+            if text is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT text FROM texts WHERE content_hash = ? AND created_at >= ?",
+                    (content_hash, time.time() - self.max_age)
+                ).fetchone()
+                text = row[0] if row else None
+            if text is not None:
+                self._stats['content_hits'] += 1
+            return text
+
+    def is_fresh(self, entry):
+        """Whether an entry can be served without asking the origin"""
+        return time.time() - entry.validated_at < self.fresh_for
+
+    # ----------------------------
+    # Updates
+    # ----------------------------
+    def mark_revalidated(self, entry):
+        """Record a 304 Not Modified answer for an entry"""
+        now = time.time()
+        with self._lock:
+            entry.validated_at = now
+            remembered = self._urls.get(entry.url)
+            if remembered is not None and remembered.content_hash == entry.content_hash:
+                remembered.validated_at = now
+            self._stats['revalidated'] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "UPDATE urls SET validated_at = ? WHERE url = ?", (now, entry.url)
+                )
+                self._db.commit()
+
+    def put(self, url, content_hash, text, etag=None, last_modified=None):
+        """Store extracted text for a URL and its content hash"""
+        now = time.time()
+        entry = CacheEntry(url, content_hash, text, etag, last_modified, now)
+        with self._lock:
+            self._remember(entry, now)
+            if self._db is None:
+                return entry
+            size = len(text.encode('utf-8'))
+            inserted = self._db.execute(
+                "INSERT INTO texts (content_hash, text, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(content_hash) DO NOTHING",
+                (content_hash, text, size, now, now)
+            ).rowcount
+            if inserted:
+                self._disk_bytes += size
+            else:
+                self._db.execute(
+                    "UPDATE texts SET accessed_at = ? WHERE content_hash = ?", (now, content_hash)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO urls (url, content_hash, etag, last_modified, validated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, now)
+            )
+            self._db.commit()
+            self._evict_disk(now)
+        return entry
+
+    def stats(self):
+        """Hit / miss counters and current sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._texts)
+            if self._db is not None:
+                count, size = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM texts"
+                ).fetchone()
+                stats['disk_entries'] = count
+                stats['disk_bytes'] = size
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            hits = stats['memory_hits'] + stats['disk_hits']
+            stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+            return stats
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+    # ----------------------------
+    # Internals (caller holds the lock)
+    # ----------------------------
+    def _memory_text(self, content_hash, now):
+        cached = self._texts.get(content_hash)
+        if cached is None:
+            return None
+        text, created_at = cached
+        if now - created_at > self.max_age:
+            del self._texts[content_hash]
+            self._stats['evictions'] += 1
+            return None
+        self._texts.move_to_end(content_hash)
+        return text
+
+    def _remember(self, entry, created_at):
+        self._urls[entry.url] = entry.with_text(None)
+        self._urls.move_to_end(entry.url)
+        # The same bytes stored again keep their original age, as on disk
+        cached = self._texts.get(entry.content_hash)
+        if cached is not None:
+            created_at = cached[1]
+        self._texts[entry.content_hash] = (entry.text, created_at)
+        self._texts.move_to_end(entry.content_hash)
+
+        while len(self._texts) > self.memory_entries:
+            self._texts.popitem(last=False)
+            self._stats['evictions'] += 1
+        while len(self._urls) > self.memory_entries * 2:
+            self._urls.popitem(last=False)
+
+    def _resync_disk_bytes(self):
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        self._puts_since_resync = 0
+
+    def _evict_disk(self, now):
+        evicted = 0
+        cutoff = now - self.max_age
+        expired_count, expired_size = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM texts WHERE created_at < ?", (cutoff,)
+        ).fetchone()
+        if expired_count:
+            self._db.execute("DELETE FROM texts WHERE created_at < ?", (cutoff,))
+            self._disk_bytes -= expired_size
+            evicted += expired_count
+
+        # The running total is exact for this process only; re-read it
+        # before evicting and every RESYNC_EVERY puts
+        self._puts_since_resync += 1
+        if self._disk_bytes > self.max_disk_bytes or self._puts_since_resync >= self.RESYNC_EVERY:
+            self._resync_disk_bytes()
+        total = self._disk_bytes
+        if total > self.max_disk_bytes:
+            rows = self._db.execute(
+                "SELECT content_hash, size FROM texts ORDER BY accessed_at"
+            ).fetchall()
+            stale = []
+            for content_hash, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                stale.append((content_hash,))
+                total -= size
+            self._db.executemany("DELETE FROM texts WHERE content_hash = ?", stale)
+            self._disk_bytes = total
+            evicted += len(stale)
+
+        if evicted:
+            self._db.execute(
+                "DELETE FROM urls WHERE content_hash NOT IN (SELECT content_hash FROM texts)"
+            )
+            self._stats['evictions'] += evicted
+        self._db.commit()
@@ -0,0 +1,175 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+from spooled_body import DEFAULT_MAX_BYTES, DEFAULT_SPOOL_BYTES, SpooledBody
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchResult:
+    """Outcome of a single resume download; close() it to free the body"""
+
+    __slots__ = ('url', 'status_code', 'body', 'headers')
+
+    def __init__(self, url, status_code, body=None, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.body = body if body is not None else SpooledBody.from_bytes(b'')
+        self.headers = headers or {}
+
+    @property
+    def not_modified(self):
+        return self.status_code == 304
+
+    @property
+    def content(self):
+        """Body as bytes (a copy when it was spooled to disk)"""
+        return self.body.getvalue()
+
+    def close(self):
+        self.body.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class _HostSlot:
+    """Per-host semaphore plus the number of downloads using or waiting for it"""
+
+    __slots__ = ('semaphore', 'users')
+
+    def __init__(self, limit):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
+
+class ResumeFetcher:
+    """
+    Async resume downloader shared by all requests.
+
+    One pooled httpx client keeps connections alive between ranking runs,
+    a global semaphore bounds total in-flight downloads and a per-host
+    semaphore keeps a single origin (e.g. Cloudinary) from taking the
+    whole budget. The host slot is taken first, so downloads queued behind
+    a busy host do not hold global slots other hosts could use; per-host
+    semaphores are dropped once idle. Transient failures are retried with
+    exponential backoff.
+
+    Bodies are streamed into a SpooledBody, so each download holds at most
+    spool_bytes in memory and anything over max_bytes is cut off.
+    """
+
+    def __init__(self, max_concurrency=32, max_per_host=8, retries=3,
+                 backoff=0.5, timeout=30.0, max_bytes=DEFAULT_MAX_BYTES,
+                 spool_bytes=DEFAULT_SPOOL_BYTES, spool_dir=None, chunk_size=64 * 1024):
+        """
+        Args:
+            max_concurrency: Max downloads in flight across all hosts
+            max_per_host: Max downloads in flight to a single host
+            retries: Extra attempts after the first failure
+            backoff: Base delay in seconds, doubled after each attempt
+            timeout: Per-attempt timeout in seconds
+            max_bytes: Largest accepted resume; larger ones raise ResumeTooLarge
+            spool_bytes: Body size above which it is spooled to a temporary file
+            spool_dir: Directory for spooled bodies (system temp dir if None)
+            chunk_size: Bytes read from the socket at a time
+        """
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.spool_dir = spool_dir
+        self.chunk_size = chunk_size
+
+        self._client = None
+        self._slots = None
+        self._host_slots = {}  # host -> _HostSlot, only while in use
+
+    async def start(self):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60.0
+            )
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _host_slot(self, host):
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = _HostSlot(self.max_per_host)
+        slot.users += 1
+        try:
+            async with slot.semaphore:
+                yield
+        finally:
+            slot.users -= 1
+            if not slot.users:
+                del self._host_slots[host]
+
+    async def fetch(self, url, headers=None):
+        """
+        Download a URL, retrying connection errors and retryable statuses
+
+        Args:
+            url: Resume URL
+            headers: Extra request headers (e.g. conditional validators)
+
+        Returns:
+            FetchResult (to be closed by the caller); 304 responses are
+            returned, other HTTP errors raise, and so does ResumeTooLarge
+        """
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            body = SpooledBody(self.max_bytes, self.spool_bytes, self.spool_dir)
+            try:
+                async with self._host_slot(host), self._slots:
+                    async with self._client.stream('GET', url, headers=headers) as response:
+                        if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                            raise httpx.HTTPStatusError(
+                                f"Retryable status {response.status_code}",
+                                request=response.request,
+                                response=response
+                            )
+                        if response.status_code != 304:
+                            response.raise_for_status()
+                            body.check_length(response.headers.get('Content-Length'))
+                            async for chunk in response.aiter_bytes(self.chunk_size):
+                                body.write(chunk)
+                            body.finish()
+                return FetchResult(url, response.status_code, body, response.headers)
+
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                body.close()
+                retryable = not isinstance(e, httpx.HTTPStatusError) or \
+                    e.response.status_code in RETRY_STATUSES
+                if not retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+                attempt += 1
+            except BaseException:
+                body.close()  # e.g. ResumeTooLarge or cancellation
+                raise
@@ -0,0 +1,132 @@
+import re
+
+
+# Header phrases per section; words may be separated by any whitespace
+DEFAULT_HEADERS = {
+    'skills': ('technical skills', 'skills', 'skill'),
+    'experience': ('professional experience', 'work experience', 'experience'),
+    'education': ('academic background', 'education'),
+    'projects': ('projects',),
+}
+
+# Longest section body kept, in characters; a header whose body runs longer
+# than this before the next section is skipped in favour of a later one
+DEFAULT_LIMITS = {'skills': 500, 'experience': 1000, 'education': 500}
+DEFAULT_LIMIT = 500
+
+# Sections returned by default; the others (projects) only end a section
+DEFAULT_OUTPUT = ('skills', 'experience', 'education')
+
+
+class SectionScanner:
+    """
+    Splits resume text into sections in one linear scan.
+
+    All header phrases are compiled into a single alternation, so one
+    finditer over the text finds every header of every section. A
+    section's body runs from its header (plus any following spaces or
+    colons) to the next header of a different section, or the end of the
+    text. This replaces a series of lazy DOTALL regexes, one per section,
+    that backtracked across the whole document.
+
+    Headers only match as whole words, so 'skill' in 'skilled' does not
+    end the experience section around it.
+    """
+
+    def __init__(self, headers=None, limits=None, output=DEFAULT_OUTPUT):
+        """
+        Args:
+            headers: Dict of section name -> header phrases (default DEFAULT_HEADERS)
+            limits: Dict of section name -> longest body in characters
+            output: Sections included in the result besides full_text;
+                sections only in `headers` still end the sections around them
+        """
+        self.headers = {name: tuple(phrases) for name, phrases in (headers or DEFAULT_HEADERS).items()}
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.output = tuple(output)
+
+        # Header phrase (words joined by single spaces) -> section
+        self._phrases = {}
+        for name, phrases in self.headers.items():
+            for phrase in phrases:
+                words = phrase.lower().split()
+                if words:
+                    self._phrases.setdefault(' '.join(words), name)
+        # One unnamed group, longest phrase first ('skills' before its prefix
+        # 'skill'); plain alternatives let re skip ahead on their first letters.
+        # Lookarounds rather than \b, so phrases may start or end in punctuation
+        alternatives = sorted(self._phrases, key=len, reverse=True)
+        self.pattern = re.compile(
+            r'(?<!\w)(' + '|'.join(r'\s+'.join(map(re.escape, phrase.split())) for phrase in alternatives)
+            + r')(?!\w)[\s:]*'
+        ) if alternatives else None
+
+    @classmethod
+    def with_extra_headers(cls, extra_headers):
+        """
+        Default scanner plus additional sections, e.g.
+        {'certifications': ['certifications', 'licenses']}; those sections
+        are also returned
+        """
+        headers = {name: list(phrases) for name, phrases in DEFAULT_HEADERS.items()}
+        output = list(DEFAULT_OUTPUT)
+        for name, phrases in extra_headers.items():
+            if isinstance(phrases, str):
+                phrases = [phrases]
+            headers.setdefault(name, []).extend(phrases)
+            if name not in output:
+                output.append(name)
+        return cls(headers=headers, output=output)
+
+    def _markers(self, text):
+        """(header start, body start, section) of every header, in text order"""
+        if self.pattern is None:
+            return
+        phrases = self._phrases
+        for match in self.pattern.finditer(text):
+            header = match.group(1)
+            name = phrases.get(header) or phrases[' '.join(header.split())]
+            yield match.start(), match.end(), name
+
+    def scan(self, text):
+        """
+        Returns:
+            Dict with one (lowercased) body per output section, '' when not
+            found, and the original text under 'full_text'
+        """
+        sections = dict.fromkeys(self.output, '')
+        sections['full_text'] = text
+        if not text:
+            return sections
+
+        text_lower = text.lower()
+        missing = set(self.output)
+
+        # Headers of one section seen since the last header of another; each
+        # one's body ends where the next different section starts
+        pending, pending_name = [], None
+
+        def resolve(body_end):
+            for body_start in pending:
+                if body_end - body_start <= self.limits.get(pending_name, DEFAULT_LIMIT):
+                    sections[pending_name] = text_lower[body_start:body_end].strip()
+                    missing.discard(pending_name)
+                    break
+
+        for header_start, body_start, name in self._markers(text_lower):
+            if name != pending_name:
+                if pending_name in missing:
+                    resolve(header_start)
+                if not missing:
+                    return sections
+                pending, pending_name = [], name
+            if name in missing:
+                pending.append(body_start)
+
+        if pending_name in missing:
+            # Like the regexes' `$`, a single trailing newline is not part of the body
+            resolve(len(text_lower) - 1 if text_lower.endswith('\n') else len(text_lower))
+        return sections
+
+
+DEFAULT_SCANNER = SectionScanner()
@@ -0,0 +1,200 @@
+"""
+Structured, non-blocking logging for the service.
+
+Records are serialized and written on a background thread: request
+handlers only put them on a bounded queue (QueueHandler) and a
+QueueListener writes them to stdout, so a slow log collector never stalls the ranking pipeline. When the
+queue is full, records are dropped and counted instead of blocking.
+
+Environment:
+    LOG_LEVEL              DEBUG / INFO / WARNING / ERROR (default INFO)
+    LOG_FORMAT             json (default) or text
+    LOG_QUEUE_SIZE         records buffered before dropping (default 10000)
+    LOG_RESUME_SAMPLE_RATE share of per-resume records below WARNING that are
+                           kept (default 0.1); log those with extra=PER_RESUME
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+
+
+# Correlation id of the request (or background job) being handled
+request_id = contextvars.ContextVar('request_id', default=None)
+
+# Pass as `extra` on messages logged once per resume, so they are sampled
+PER_RESUME = {'per_resume': True}
+
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'per_resume'
+}
+_listener = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; `extra` fields are included as keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.request_id:
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+
+class ContextFilter(logging.Filter):
+    """
+    Runs in the thread that logs, before anything is queued: tags records
+    with the request id and samples per-resume records
+    """
+
+    def __init__(self, resume_sample_rate):
+        super().__init__()
+        self.resume_sample_rate = resume_sample_rate
+
+    def filter(self, record):
+        if getattr(record, 'per_resume', False) and record.levelno < logging.WARNING:
+            if self.resume_sample_rate < 1.0 and random.random() >= self.resume_sample_rate:
+                return False
+        record.request_id = request_id.get()
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only merge the arguments here; JSON encoding and tracebacks are
+        # formatted by the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _formatter(log_format):
+    return TextFormatter() if log_format == 'text' else JSONFormatter()
+
+
+def configure_logging():
+    """Route the root logger through the background queue (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_formatter(os.getenv('LOG_FORMAT', 'json')))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.getenv('LOG_QUEUE_SIZE', '10000'))))
+    handler.addFilter(ContextFilter(float(os.getenv('LOG_RESUME_SAMPLE_RATE', '0.1'))))
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def configure_worker_logging():
+    """
+    Logging for PDF parse pool processes: direct writes are fine there,
+    since they run outside the event loop
+    """
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(_formatter(os.getenv('LOG_FORMAT', 'json')))
+    stream.addFilter(ContextFilter(float(os.getenv('LOG_RESUME_SAMPLE_RATE', '0.1'))))
+    root = logging.getLogger()
+    root.handlers[:] = [stream]
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records():
+    handlers = logging.getLogger().handlers
+    return sum(getattr(handler, 'dropped', 0) for handler in handlers)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that gives every HTTP request a correlation id: the
+    caller's X-Request-ID when it looks sane, otherwise a new one. It is
+    set as `request_id` for all logs of the request and echoed back.
+    """
+
+    VALID_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for name, value in scope['headers']:
+            if name == b'x-request-id':
+                incoming = value.decode('latin-1')
+                break
+        rid = incoming if incoming and self.VALID_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(rid)
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                message = {**message, 'headers': list(message.get('headers', [])) + [
+                    (b'x-request-id', rid.encode('latin-1'))
+                ]}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            logging.getLogger('access').debug(
+                "%s %s", scope['method'], scope['path'],
+                extra={'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+            )
+            request_id.reset(token)
@@ -0,0 +1,130 @@
+"""
+Prometheus metrics for the ranking pipeline, served by GET /metrics.
+
+Stage timers are pre-bound label children, so recording one costs a
+perf_counter pair and a bucket lookup (plus adding to the request's
+RequestProfile when it opted into profiling). Stages are timed once per
+request or per resume, never once per applicant inside the ranking loops.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory so /metrics aggregates every worker (prometheus_client
+multiprocess mode).
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+
+from request_profiler import current_profile
+
+# Seconds, from a cached lookup up to a slow multi-page download
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+APPLICANT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+STAGES = ('download', 'parse', 'vectorize', 'predict', 'rank', 'serialize')
+
+STAGE_SECONDS = Histogram(
+    'resume_ranker_stage_seconds',
+    'Time spent in each ranking pipeline stage',
+    ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    'resume_ranker_request_seconds',
+    'End-to-end ranking time per endpoint',
+    ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+APPLICANTS_PER_REQUEST = Histogram(
+    'resume_ranker_applicants_per_request',
+    'Applications submitted per ranking request',
+    ['endpoint'],
+    buckets=APPLICANT_BUCKETS
+)
+RESUMES_FETCHED = Counter(
+    'resume_ranker_resumes_fetched_total',
+    'Resume downloads that returned a response (including 304 Not Modified)'
+)
+RESUME_FETCH_FAILURES = Counter(
+    'resume_ranker_resume_fetch_failures_total',
+    'Resume downloads that failed after retries'
+)
+RESUMES_TRUNCATED = Counter(
+    'resume_ranker_resumes_truncated_total',
+    'Resumes whose extraction stopped at a page, character or time limit',
+    ['reason']
+)
+EXTRACTION_CACHE = Counter(
+    'resume_ranker_extraction_cache_total',
+    'Resume text lookups by outcome: fresh (no request), revalidated (304), '
+    'content (same PDF bytes parsed before) or miss (parsed)',
+    ['result']
+)
+RANKINGS_IN_FLIGHT = Gauge(
+    'resume_ranker_rankings_in_flight',
+    'Ranking requests and background jobs currently being processed',
+    multiprocess_mode='livesum'
+)
+MODEL_INFO = Gauge(
+    'resume_ranker_model_info',
+    'Loaded model version (value is the load time, unix seconds)',
+    ['version'],
+    multiprocess_mode='max'
+)
+
+
+class _StageTimer:
+    __slots__ = ('name', 'histogram', 'started')
+
+    def __init__(self, name, histogram):
+        self.name = name
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        self.histogram.observe(elapsed)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add(self.name, elapsed)
+        return False
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+        self.histogram = STAGE_SECONDS.labels(name)
+
+    def time(self):
+        return _StageTimer(self.name, self.histogram)
+
+
+stage = {name: _Stage(name) for name in STAGES}
+cache_result = {name: EXTRACTION_CACHE.labels(name) for name in ('fresh', 'revalidated', 'content', 'miss')}
+
+
+def set_model_info(ranker, previous_version=None):
+    if previous_version is not None and previous_version != ranker.model_version:
+        try:
+            MODEL_INFO.remove(previous_version)
+        except KeyError:
+            pass
+    MODEL_INFO.labels(ranker.model_version).set(ranker.loaded_at)
+
+
+def render():
+    """(body, content type) for the /metrics response"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
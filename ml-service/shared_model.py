@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import sklearn
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from model_artifacts import source_key
+from tree_predictor import TreeEnsemblePredictor
+
+logger = logging.getLogger(__name__)
+
+
+class SharedVectorizer:
+    """
+    Read-only, memory-mapped stand-in for a fitted word-unigram
+    Count/TfidfVectorizer.
+
+    The vocabulary is a sorted fixed-width bytes array searched with
+    np.searchsorted, and the IDF weights are a float64 array; both are
+    np.load(mmap_mode='r') views of files, so every worker process maps the
+    same page-cache pages instead of unpickling its own dict of Python
+    strings. Produces the same counts and tf-idf values as the original.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'shell.pkl'), 'rb') as f:
+            shell = pickle.load(f)  # unfitted clone: parameters only
+        with open(os.path.join(directory, 'vectorizer.json')) as f:
+            meta = json.load(f)
+
+        self.binary = shell.binary
+        self.dtype = shell.dtype
+        self.n_features = meta['n_features']
+        self.norm = meta['norm']
+        self.sublinear_tf = meta['sublinear_tf']
+        self._analyze = shell.build_analyzer()
+
+        self.terms = np.load(os.path.join(directory, 'terms.npy'), mmap_mode='r')
+        self.columns = np.load(os.path.join(directory, 'columns.npy'), mmap_mode='r')
+        idf_path = os.path.join(directory, 'idf.npy')
+        self.idf = np.load(idf_path, mmap_mode='r') if os.path.exists(idf_path) else None
+        self._max_term_bytes = self.terms.dtype.itemsize
+
+    @staticmethod
+    def supports(vectorizer):
+        return (
+            isinstance(vectorizer, CountVectorizer)
+            and vectorizer.analyzer == 'word'
+            and tuple(vectorizer.ngram_range) == (1, 1)
+            and hasattr(vectorizer, 'vocabulary_')
+        )
+
+    @staticmethod
+    def build(vectorizer, directory):
+        """Write the arrays SharedVectorizer maps into `directory`"""
+        terms = sorted(
+            (term.encode('utf-8'), column) for term, column in vectorizer.vocabulary_.items()
+        )
+        width = max((len(term) for term, _ in terms), default=1)
+        np.save(os.path.join(directory, 'terms.npy'),
+                np.array([term for term, _ in terms], dtype=f'S{width}'))
+        np.save(os.path.join(directory, 'columns.npy'),
+                np.array([column for _, column in terms], dtype=np.int32))
+
+        tfidf = getattr(vectorizer, '_tfidf', None)
+        use_idf = tfidf is not None and getattr(tfidf, 'use_idf', False)
+        if use_idf:
+            np.save(os.path.join(directory, 'idf.npy'), np.asarray(tfidf.idf_, dtype=np.float64))
+
+        with open(os.path.join(directory, 'shell.pkl'), 'wb') as f:
+            pickle.dump(clone(vectorizer), f, protocol=5)
+        with open(os.path.join(directory, 'vectorizer.json'), 'w') as f:
+            json.dump({
+                'n_features': len(terms),
+                'norm': tfidf.norm if tfidf is not None else None,
+                'sublinear_tf': bool(tfidf.sublinear_tf) if tfidf is not None else False,
+            }, f)
+
+    def count_terms(self, texts):
+        """Equivalent of CountVectorizer.transform(vectorizer, texts)"""
+        tokens, row_lengths = [], []
+        for text in texts:
+            doc_tokens = [token.encode('utf-8') for token in self._analyze(text)]
+            tokens.extend(doc_tokens)
+            row_lengths.append(len(doc_tokens))
+
+        rows = np.repeat(np.arange(len(row_lengths)), row_lengths)
+        fits = np.fromiter((len(token) <= self._max_term_bytes for token in tokens),
+                           dtype=bool, count=len(tokens))
+        candidates = np.array([t for t, ok in zip(tokens, fits) if ok],
+                              dtype=self.terms.dtype)
+
+        if candidates.size and self.terms.size:
+            positions = np.minimum(np.searchsorted(self.terms, candidates), self.terms.size - 1)
+            found = self.terms[positions] == candidates
+            columns = np.asarray(self.columns[positions[found]])
+            rows = rows[fits][found]
+        else:
+            columns = np.array([], dtype=np.int32)
+            rows = np.array([], dtype=np.int64)
+
+        counts = sparse.csr_matrix(
+            (np.ones(columns.size, dtype=self.dtype), (rows, columns)),
+            shape=(len(row_lengths), self.n_features),
+            dtype=self.dtype
+        )
+        counts.sum_duplicates()
+        counts.sort_indices()
+        if self.binary:
+            counts.data[:] = 1
+        return counts
+
+    def counts_to_tfidf(self, counts, copy=True):
+        """Equivalent of the fitted TfidfTransformer.transform(counts)"""
+        X = sparse.csr_matrix(counts, dtype=np.float64, copy=copy)
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if self.norm:
+            X = normalize(X, norm=self.norm, copy=False)
+        return X
+
+    def transform(self, texts):
+        return self.counts_to_tfidf(self.count_terms(texts), copy=False)
+
+
+class SharedModelStore:
+    """
+    Builds memory-mappable copies of the vectorizer and compiled trees once
+    per source version, and maps them read-only in every worker.
+
+    Same interface as ModelArtifactCache, so ResumeRanker can take either.
+    The first worker to start builds into a temporary directory that is then
+    renamed into place; concurrent builders simply discard their copy.
+    """
+
+    def __init__(self, directory='.shared_model'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def load_vectorizer(self, vectorizer_path):
+        key = source_key(vectorizer_path, sklearn.__version__, np.__version__)
+        target = os.path.join(self.directory, f"vectorizer-{key}")
+
+        if not os.path.isdir(target):
+            with open(vectorizer_path, 'rb') as f:
+                vectorizer = pickle.load(f)
+            if not SharedVectorizer.supports(vectorizer):
+                logger.warning("Vectorizer cannot be shared (needs word unigrams), loading a private copy")
+                return vectorizer
+            self._build(target, lambda directory: SharedVectorizer.build(vectorizer, directory))
+
+        return SharedVectorizer(target)
+
+    def load_tree_predictor(self, model_path):
+        key = source_key(model_path, np.__version__)
+        target = os.path.join(self.directory, f"trees-{key}")
+
+        if not os.path.isdir(target):
+            predictor = TreeEnsemblePredictor(model_path)
+            self._build(target, predictor.save_arrays)
+
+        return TreeEnsemblePredictor.load_arrays(target, mmap_mode='r')
+
+    def _build(self, target, write):
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix='.build-')
+        try:
+            write(tmp)
+            os.rename(tmp, target)
+        except OSError:
+            if not os.path.isdir(target):
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_SPOOL_BYTES = 1024 * 1024
+
+
+class ResumeTooLarge(ValueError):
+    """Download is larger than the configured maximum"""
+
+
+class SpooledBody:
+    """
+    Downloaded response body, written chunk by chunk.
+
+    The first `spool_bytes` stay in memory; a larger body is moved to a
+    temporary file, so a download never holds more than spool_bytes (plus
+    one chunk) of RAM however big the file is. Bodies over `max_bytes` are
+    rejected with ResumeTooLarge as soon as they cross the limit, or before
+    reading anything when Content-Length already says so. The SHA-256
+    content hash is computed while writing, so the bytes are not read
+    again just to look them up in the text cache.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, spool_bytes=DEFAULT_SPOOL_BYTES, spool_dir=None):
+        """
+        Args:
+            max_bytes: Largest accepted body (None for no limit)
+            spool_bytes: Size above which the body moves to a temporary file
+            spool_dir: Directory for temporary files (system default if None)
+        """
+        self.max_bytes = max_bytes
+        self.spool_bytes = spool_bytes
+        self.spool_dir = spool_dir
+        self.size = 0
+        self.path = None
+        self._hash = hashlib.sha256()
+        self._memory = BytesIO()
+        self._file = None
+
+    @classmethod
+    def from_bytes(cls, content):
+        """Wrap bytes that are already in memory (no copy is made)"""
+        body = cls(max_bytes=None)
+        body._memory = BytesIO(content)
+        body._hash.update(content)
+        body.size = len(content)
+        return body
+
+    def check_length(self, content_length):
+        """Reject a response up front from its Content-Length header value"""
+        if self.max_bytes is None or not content_length:
+            return
+        try:
+            declared = int(content_length)
+        except ValueError:
+            return
+        if declared > self.max_bytes:
+            raise ResumeTooLarge(f"Resume is {declared} bytes, limit is {self.max_bytes}")
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise ResumeTooLarge(f"Resume exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        if self._file is None and self.size > self.spool_bytes:
+            self._rollover()
+        (self._file or self._memory).write(chunk)
+
+    def finish(self):
+        """
+        Flush a spooled body to disk once the last chunk is written, so a
+        process reading `path` sees the whole file. Safe to call twice.
+        """
+        if self._file is not None:
+            self._file.flush()
+        return self
+
+    def _rollover(self):
+        fd, self.path = tempfile.mkstemp(prefix='resume-', suffix='.pdf', dir=self.spool_dir)
+        self._file = os.fdopen(fd, 'w+b')
+        self._file.write(self._memory.getbuffer())
+        self._memory = None
+
+    @property
+    def content_hash(self):
+        """Same value as ResumeTextCache.content_hash(bytes)"""
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self):
+        return self._file is None
+
+    def reader(self):
+        """The body as a binary file object positioned at the start (not a copy)"""
+        stream = self._file or self._memory
+        stream.flush()
+        stream.seek(0)
+        return stream
+
+    def getvalue(self):
+        """The body as bytes (a copy when spooled to disk)"""
+        if self._file is None:
+            return self._memory.getvalue()
+        return self.reader().read()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,27 @@
+import os
+import pickle
+import sys
+
+import pytest
+
+# The service is a flat set of modules run from ml-service/; make them importable
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+MODEL_PATH = os.path.join(SERVICE_DIR, 'lightgbm_ranking.txt')
+
+
+@pytest.fixture
+def make_ranker(tmp_path):
+    """ResumeRanker over the shipped model and a given (fitted) vectorizer"""
+    from ml_service import ResumeRanker
+
+    def make(vectorizer, **kwargs):
+        vectorizer_path = tmp_path / f'vectorizer-{len(list(tmp_path.iterdir()))}.pkl'
+        with open(vectorizer_path, 'wb') as f:
+            pickle.dump(vectorizer, f)
+        kwargs.setdefault('prune_vectorizer', False)
+        kwargs.setdefault('model_path', MODEL_PATH)
+        return ResumeRanker(vectorizer_path=str(vectorizer_path), **kwargs)
+
+    return make
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks import fixtures
+
+
+@pytest.fixture(scope='module')
+def ranker(tmp_path_factory):
+    import pickle
+
+    from conftest import MODEL_PATH
+    from ml_service import ResumeRanker
+
+    vectorizer_path = tmp_path_factory.mktemp('ranker') / 'vectorizer.pkl'
+    with open(vectorizer_path, 'wb') as f:
+        pickle.dump(TfidfVectorizer().fit(fixtures.resume_texts(20, 50)), f)
+    return ResumeRanker(model_path=MODEL_PATH, vectorizer_path=str(vectorizer_path), prune_vectorizer=False)
+
+
+def old_assign_ranks(ranker, applications, scores):
+    """The per-application loop assign_ranks replaced, with categorize_score as the oracle"""
+    for app, score in zip(applications, scores):
+        app['rank_score'] = float(score)
+    ranked_applications = sorted(applications, key=lambda x: x['rank_score'], reverse=True)
+    all_scores = [app['rank_score'] for app in ranked_applications]
+    for i, app in enumerate(ranked_applications):
+        app['rank'] = i + 1
+        app['match_category'] = ranker.categorize_score(app['rank_score'], all_scores)
+        app['match_percentage'] = round(max(0.0, min(app['rank_score'], 1.0)) * 100, 1)
+    return ranked_applications
+
+
+def apps(n):
+    return [{'id': str(i)} for i in range(n)]
+
+
+rng = np.random.default_rng(0)
+SCORES = {
+    'single': [0.4],
+    'random': rng.random(500).tolist(),
+    'all tied': [0.5] * 9,
+    'ties at the percentiles': [0.2, 0.2, 0.2, 0.5, 0.5, 0.5, 0.9, 0.9, 0.9, 0.9],
+    'coarse ties': rng.integers(0, 4, 200).astype(float).tolist(),
+    'outside [0, 1]': [-0.75, 1.5, 0.3, -0.0001, 1.0, 0.0, 2.25, 0.66, -3.0],
+    'raw model margins': rng.normal(0, 3, 300).tolist(),
+    'half-way percentages': [0.0005, 0.0015, 0.1235, 0.2345, 0.9995, 0.555, 0.285],
+}
+
+
+@pytest.mark.parametrize('name', list(SCORES))
+def test_assign_ranks_matches_old_loop(ranker, name):
+    scores = SCORES[name]
+    expected = old_assign_ranks(ranker, apps(len(scores)), scores)
+    actual = ranker.assign_ranks(apps(len(scores)), np.array(scores))
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', list(SCORES))
+def test_categorize_scores_matches_categorize_score(ranker, name):
+    scores = SCORES[name]
+    expected = [ranker.categorize_score(score, scores) for score in scores]
+    assert ranker.categorize_scores(scores).tolist() == expected
+
+
+def test_empty(ranker):
+    assert ranker.assign_ranks([], np.array([])) == []
+    assert ranker.categorize_scores([]).tolist() == []
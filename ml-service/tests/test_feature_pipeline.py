@@ -0,0 +1,75 @@
+import shutil
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from benchmarks import fixtures
+from conftest import MODEL_PATH
+
+TRAINING_TEXTS = fixtures.resume_texts(300, 200, seed=1) + [fixtures.JOB_DESCRIPTION]
+RESUMES = fixtures.resume_texts(12, 150, seed=2) + ["", "Python!! C++ & SQL; ML/AI"]
+JOB = fixtures.JOB_DESCRIPTION
+
+VECTORIZERS = {
+    'tfidf-l2': lambda: TfidfVectorizer(),
+    'tfidf-sublinear': lambda: TfidfVectorizer(sublinear_tf=True),
+    'tfidf-binary': lambda: TfidfVectorizer(binary=True),
+    'tfidf-l1-no-idf': lambda: TfidfVectorizer(norm='l1', use_idf=False),
+    'counts': lambda: CountVectorizer(),
+    'bigrams (not additive)': lambda: TfidfVectorizer(ngram_range=(1, 2)),
+}
+
+
+@pytest.fixture(params=list(VECTORIZERS))
+def ranker(request, make_ranker):
+    return make_ranker(VECTORIZERS[request.param]().fit(TRAINING_TEXTS))
+
+
+def combined(ranker):
+    """What the ranker computed before: the vectorizer on resume + job text"""
+    return ranker.vectorizer.transform([f"{resume} {JOB}" for resume in RESUMES])
+
+
+def assert_same(actual, expected, rtol=1e-12, atol=1e-12):
+    np.testing.assert_allclose(actual.toarray(), expected.toarray(), rtol=rtol, atol=atol)
+
+
+def test_transform_with_job_matches_combined_text(ranker):
+    assert_same(ranker.transform_with_job(RESUMES, JOB), combined(ranker))
+
+
+def test_stored_counts_match_combined_text(ranker):
+    if not ranker.supports_stored_counts:
+        pytest.skip("vectorizer counts are not additive")
+    counts = ranker.count_resumes(RESUMES)
+    counts.data = counts.data.astype(np.float32)  # as kept by FeatureStore
+    stored = [counts[i] if i % 3 else None for i in range(len(RESUMES))]
+
+    merged = ranker.merge_counts(RESUMES, stored)
+    assert_same(ranker.transform_counts_with_job(merged, JOB), combined(ranker))
+
+
+def test_scores_match_combined_text(ranker):
+    expected = ranker.model.predict(ranker._model_columns(combined(ranker)))
+    scores, ok = ranker.score_texts(RESUMES, JOB)
+    assert ok
+    np.testing.assert_allclose(scores, expected, rtol=1e-6)
+
+
+def test_counts_version_ignores_the_model_file(make_ranker, tmp_path):
+    vectorizer = TfidfVectorizer(norm=None).fit(TRAINING_TEXTS)
+    retrained = tmp_path / 'retrained.txt'
+    shutil.copy(MODEL_PATH, retrained)
+    with open(retrained, 'a') as f:
+        f.write('\n')  # another model file, same vectorizer
+
+    ranker = make_ranker(vectorizer)
+    same_vectorizer = make_ranker(vectorizer, model_path=str(retrained))
+    assert ranker.model_version != same_vectorizer.model_version
+    assert ranker.counts_version == same_vectorizer.counts_version
+
+    pruned = make_ranker(vectorizer, prune_vectorizer=True)
+    assert pruned.counts_version != ranker.counts_version
+    other_vectorizer = make_ranker(TfidfVectorizer(norm=None).fit(TRAINING_TEXTS[:50]))
+    assert other_vectorizer.counts_version != ranker.counts_version
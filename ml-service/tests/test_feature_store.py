@@ -0,0 +1,56 @@
+import numpy as np
+from scipy import sparse
+
+from feature_store import FeatureStore
+
+
+def applications(n):
+    return [
+        {'id': f'app{i}', 'resumeFileUrl': f'https://example.com/{i}.pdf', 'coverLetter': f'letter {i}'}
+        for i in range(n)
+    ]
+
+
+def counts(n, n_columns=50, seed=0):
+    """Integer term counts, exactly representable in float32"""
+    matrix = sparse.random(n, n_columns, density=0.2, format='csr', random_state=seed)
+    matrix.data = np.ceil(matrix.data * 10)
+    return matrix
+
+
+def test_round_trip(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    apps, matrix = applications(4), counts(4)
+    store.put_many('v1', apps, [f'text {i}' for i in range(4)], matrix)
+
+    rows = store.get_many('v1', apps[::-1] + [{'id': 'unknown'}])
+    assert rows[-1] is None
+    for i, (text, row) in zip(range(3, -1, -1), rows):
+        assert text == f'text {i}'
+        assert (row != matrix[i]).nnz == 0
+
+    assert store.get_many('v2', apps) == [None] * 4
+
+
+def test_changed_source_is_stale(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    apps = applications(1)
+    store.put_many('v1', apps, ['text'], counts(1))
+    assert store.get_many('v1', [dict(apps[0], coverLetter='new letter')]) == [None]
+    assert store.stats()['stale'] == 1
+
+
+def test_append_realigns_files_after_partial_write(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    apps, matrix = applications(2), counts(2, seed=1)
+    store.put_many('v1', apps[:1], ['first'], matrix[:1])
+
+    # A crash after writing values but before indices (and before the index row)
+    space = store._space('v1')
+    with open(space.values_path, 'ab') as f:
+        f.write(np.ones(7, dtype=np.float32).tobytes())
+
+    store.put_many('v1', apps[1:], ['second'], matrix[1:])
+    reopened = FeatureStore(str(tmp_path))
+    for i, (_, row) in enumerate(reopened.get_many('v1', apps)):
+        assert (row != matrix[i]).nnz == 0
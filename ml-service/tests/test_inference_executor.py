@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from inference_executor import InferenceExecutor, InferenceQueueFull
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_call_ends():
+    async def scenario():
+        executor = InferenceExecutor(workers=1, max_queue=0)
+        release = threading.Event()
+        try:
+            task = asyncio.create_task(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            task.cancel()  # e.g. the client disconnected
+            await asyncio.gather(task, return_exceptions=True)
+
+            # The thread is still busy, so there is still no capacity
+            with pytest.raises(InferenceQueueFull):
+                await executor.run(sum, [1, 2])
+
+            release.set()
+            for _ in range(100):
+                if executor.stats()['saturation'] == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert await executor.run(sum, [1, 2]) == 3
+        finally:
+            release.set()
+            executor.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_queued_call_cancelled_before_it_starts_frees_its_slot():
+    async def scenario():
+        executor = InferenceExecutor(workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            running = asyncio.create_task(executor.run(release.wait, 5))
+            queued = asyncio.create_task(executor.run(sum, [1]))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            await asyncio.gather(queued, return_exceptions=True)
+            assert executor.stats()['saturation'] == 0.5
+            release.set()
+            assert await running is True
+        finally:
+            release.set()
+            executor.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import asyncio
+
+from benchmarks import fixtures
+from pdf_extractor import PDFTextExtractor
+from resume_cache import ResumeTextCache
+
+URL = 'https://example.com/resume.pdf'
+OLD_PDF = fixtures.resume_pdf(pages=2, words_per_page=80, seed=1)
+NEW_PDF = fixtures.resume_pdf(pages=2, words_per_page=80, seed=2)
+
+
+def test_url_moves_to_already_cached_bytes(tmp_path):
+    cache = ResumeTextCache(cache_dir=str(tmp_path))
+    extractor = PDFTextExtractor(cache=cache)
+    old_text = extractor.extract_from_bytes(OLD_PDF, url=URL, etag='"v1"').text
+    new_text = extractor.extract_from_bytes(NEW_PDF, url='https://mirror.example.com/other.pdf').text
+    assert old_text != new_text
+
+    # The resume at URL is replaced by a file the cache already holds
+    assert extractor.extract_from_bytes(NEW_PDF, url=URL, etag='"v2"').text == new_text
+    entry = cache.get(URL)
+    assert entry.content_hash == ResumeTextCache.content_hash(NEW_PDF)
+    assert entry.text == new_text
+    assert entry.etag == '"v2"'
+    cache.close()
+
+
+def test_content_hit_indexes_new_url_and_refreshes_validation(tmp_path):
+    cache = ResumeTextCache(cache_dir=str(tmp_path), fresh_for=300)
+    extractor = PDFTextExtractor(cache=cache)
+    text = extractor.extract_from_bytes(OLD_PDF, url=URL).text
+
+    other = 'https://cdn.example.com/copy.pdf'
+    result = asyncio.run(extractor.extract_from_bytes_async(OLD_PDF, url=other, last_modified='Mon'))
+    assert result.text == text
+    entry = cache.get(other)
+    assert entry is not None and entry.last_modified == 'Mon'
+    assert cache.is_fresh(entry)
+    cache.close()
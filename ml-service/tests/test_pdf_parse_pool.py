@@ -0,0 +1,33 @@
+import asyncio
+
+from benchmarks import fixtures
+from pdf_parse_pool import PDFParsePool, _parse_pdf
+
+SLOW_PDF = fixtures.resume_pdf(pages=400, words_per_page=300)
+
+
+def test_worker_timeout_returns_partial_result():
+    result = _parse_pdf(SLOW_PDF, timeout=0.05)
+    assert result.truncated
+    assert result.reason == 'timeout'
+    assert result.pages_read < 400
+
+
+def test_parse_without_timeout_reads_everything():
+    result = _parse_pdf(fixtures.resume_pdf(pages=3, words_per_page=50), timeout=5)
+    assert not result.truncated and result.pages_read == 3 and result.text
+
+
+def test_pool_counts_in_worker_timeouts_without_restarting():
+    async def scenario():
+        pool = PDFParsePool(workers=1, timeout=0.05, grace=30)
+        pool.start()
+        try:
+            return await pool.parse(SLOW_PDF), pool.stats()
+        finally:
+            pool.shutdown()
+
+    result, stats = asyncio.run(scenario())
+    assert result.reason == 'timeout' and result.truncated
+    assert stats['timeouts'] == 1
+    assert stats['restarts'] == 0
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+from benchmarks import fixtures
+from pruned_vectorizer import PrunedVectorizer
+
+NUM_FEATURES = 386
+TRAINING_TEXTS = fixtures.resume_texts(300, 200, seed=3) + [
+    "Résumé: naïve Bayes, C++ and node.js; 3d_modeling, ML/AI — Zoë's ÉCOLE projects",
+]
+TEXTS = fixtures.resume_texts(10, 400, seed=4) + [
+    "",
+    "RÉSUMÉ naïve bayes c++ NODE.JS 3d_modeling ml/ai zoë's école",
+    "tab\tseparated\nlines and unicode spaces, x y z",
+    "PYTHON python Python pythonic _python python_",
+]
+
+VECTORIZERS = {
+    'tfidf-l2': lambda: TfidfVectorizer(),
+    'tfidf-l1-sublinear': lambda: TfidfVectorizer(norm='l1', sublinear_tf=True),
+    'tfidf-l2-binary': lambda: TfidfVectorizer(binary=True),
+    'tfidf-no-norm': lambda: TfidfVectorizer(norm=None),
+    'tfidf-english-stop-words': lambda: TfidfVectorizer(stop_words='english'),
+    'counts': lambda: CountVectorizer(),
+}
+
+
+@pytest.mark.parametrize('name', list(VECTORIZERS))
+def test_matches_unpruned_vectorizer(name):
+    vectorizer = VECTORIZERS[name]().fit(TRAINING_TEXTS)
+    assert PrunedVectorizer.supports(vectorizer)
+    pruned = PrunedVectorizer(vectorizer, NUM_FEATURES)
+
+    expected = vectorizer.transform(TEXTS)[:, :NUM_FEATURES].toarray()
+    actual = pruned.transform(TEXTS)[:, :NUM_FEATURES].toarray()
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_normalized_vectorizer_shares_vocabulary_and_tokenizes_with_word_text():
+    vectorizer = TfidfVectorizer().fit(TRAINING_TEXTS)
+    pruned = PrunedVectorizer(vectorizer, NUM_FEATURES)
+    assert pruned.columns is vectorizer.vocabulary_
+    assert not pruned.pruned and pruned.pattern is None
+
+
+def test_unnormalized_vectorizer_is_pruned():
+    vectorizer = TfidfVectorizer(norm=None).fit(TRAINING_TEXTS)
+    pruned = PrunedVectorizer(vectorizer, NUM_FEATURES)
+    assert pruned.pruned and len(pruned.columns) == NUM_FEATURES
+
+
+def test_stop_words_added_after_fit_are_skipped():
+    vectorizer = TfidfVectorizer().fit(TRAINING_TEXTS)
+    vectorizer.stop_words = ['python', 'sql']
+    pruned = PrunedVectorizer(vectorizer, NUM_FEATURES)
+    assert pruned.columns is not vectorizer.vocabulary_
+    assert 'python' not in pruned.columns
+
+    expected = vectorizer.transform(TEXTS)[:, :NUM_FEATURES].toarray()
+    np.testing.assert_allclose(pruned.transform(TEXTS)[:, :NUM_FEATURES].toarray(), expected,
+                               rtol=1e-12, atol=1e-15)
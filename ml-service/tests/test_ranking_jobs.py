@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from ranking_jobs import RankingJobManager
+
+
+def test_callback_allowed_only_for_listed_hosts():
+    manager = RankingJobManager(None, callback_hosts=['Backend.internal', ' '])
+    assert manager.callback_allowed('https://backend.internal/jobs/done')
+    assert manager.callback_allowed('http://backend.internal:8000/x')
+    assert not manager.callback_allowed('http://169.254.169.254/latest/meta-data')
+    assert not manager.callback_allowed('http://backend.internal.evil.com/')
+    assert not manager.callback_allowed('file://backend.internal/etc/passwd')
+    assert not RankingJobManager(None).callback_allowed('http://localhost/')
+
+
+def test_slow_callback_does_not_block_next_job():
+    async def scenario():
+        finished = []
+        release = asyncio.Event()
+
+        async def runner(job):
+            finished.append(job.id)
+            return {}
+
+        async def slow_callback(request):
+            await release.wait()
+            return httpx.Response(200)
+
+        manager = RankingJobManager(runner, workers=1, callback_hosts=['backend'])
+        await manager.start()
+        await manager._client.aclose()
+        manager._client = httpx.AsyncClient(transport=httpx.MockTransport(slow_callback))
+        try:
+            request = SimpleNamespace(applications=[])
+            first = manager.submit(request, callback_url='http://backend/done')
+            second = manager.submit(request)
+            for _ in range(100):
+                if len(finished) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert finished == [first.id, second.id]
+            assert manager.get(second.id).status == 'completed'
+            release.set()
+        finally:
+            await manager.close()
+
+    asyncio.run(scenario())
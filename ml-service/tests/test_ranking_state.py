@@ -0,0 +1,87 @@
+import copy
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks import fixtures
+from ranking_state import RankingStateStore
+
+JOB = fixtures.JOB_DESCRIPTION
+
+
+@pytest.fixture
+def ranker(make_ranker):
+    vectorizer = TfidfVectorizer().fit(fixtures.resume_texts(200, 150, seed=1) + [JOB])
+    ranker = make_ranker(vectorizer)
+    ranker.scored = []
+    score_texts = ranker.score_texts
+
+    def counting_score_texts(resume_texts, job_description, resume_counts=None):
+        ranker.scored.append(list(resume_texts))
+        return score_texts(resume_texts, job_description, resume_counts)
+
+    ranker.score_texts = counting_score_texts
+    return ranker
+
+
+def ranked(applications):
+    return [(app['id'], app['rank'], app['rank_score'], app['match_category']) for app in applications]
+
+
+def full_rank(ranker, applications, job_description=JOB):
+    return ranked(ranker.rank_applications(copy.deepcopy(applications), job_description))
+
+
+def test_rerank_scores_only_new_and_changed_applications(ranker):
+    applications = fixtures.applications(10, 120, seed=2)
+    ranker.rank_applications(copy.deepcopy(applications), JOB, job_id='job-1')
+    assert len(ranker.scored[-1]) == 10
+
+    changed_text = fixtures.resume_text(120, seed=99)
+    new_text = fixtures.resume_text(120, seed=100)
+    applications[3]['resume_text'] = changed_text
+    applications.append({'id': 'new', 'fullname': 'Applicant new', 'resume_text': new_text})
+
+    result = ranked(ranker.rank_applications(copy.deepcopy(applications), JOB, job_id='job-1'))
+    assert sorted(ranker.scored[-1]) == sorted([changed_text, new_text])
+    assert result == full_rank(ranker, applications)
+
+
+def test_unchanged_rerank_scores_nothing(ranker):
+    applications = fixtures.applications(6, 80, seed=3)
+    first = ranked(ranker.rank_applications(copy.deepcopy(applications), JOB, job_id='job-1'))
+    calls = len(ranker.scored)
+
+    assert ranked(ranker.rank_applications(copy.deepcopy(applications), JOB, job_id='job-1')) == first
+    assert len(ranker.scored) == calls
+
+
+def test_new_job_description_drops_the_state(ranker):
+    applications = fixtures.applications(6, 80, seed=4)
+    ranker.rank_applications(copy.deepcopy(applications), JOB, job_id='job-1')
+
+    other_job = JOB + " Experience with Kubernetes and Terraform."
+    result = ranked(ranker.rank_applications(copy.deepcopy(applications), other_job, job_id='job-1'))
+    assert len(ranker.scored[-1]) == 6
+    assert result == full_rank(ranker, applications, other_job)
+
+
+def test_store_forgets_old_description_and_evicts_least_recent():
+    store = RankingStateStore(max_jobs=2)
+    store.put('a', 'h1', {'1': ('t', 0.5)})
+    assert store.get('a', 'h2') == {}
+    assert store.get('a', 'h1') == {}  # dropped by the mismatch above
+
+    store.put('a', 'h1', {'1': ('t', 0.5)})
+    store.put('b', 'h1', {})
+    store.get('a', 'h1')
+    store.put('c', 'h1', {})
+    assert store.get('b', 'h1') == {}
+    assert store.get('a', 'h1') == {'1': ('t', 0.5)}
+    assert store.stats() == {'jobs': 2, 'applications': 1}
+
+
+def test_expired_state_is_not_reused():
+    store = RankingStateStore(ttl=-1)
+    store.put('a', 'h1', {'1': ('t', 0.5)})
+    assert store.get('a', 'h1') == {}
@@ -0,0 +1,67 @@
+import time
+
+from resume_cache import ResumeTextCache
+
+
+def disk_bytes(cache):
+    return cache._db.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+
+
+def test_memory_hits_expire_after_max_age(monkeypatch):
+    cache = ResumeTextCache(cache_dir=None, max_age=100)
+    cache.put('https://example.com/a.pdf', 'hash-a', 'resume text')
+    assert cache.get('https://example.com/a.pdf').text == 'resume text'
+    assert cache.get_text('hash-a') == 'resume text'
+
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 101)
+    assert cache.get('https://example.com/a.pdf') is None
+    assert cache.get_text('hash-a') is None
+
+
+def test_url_index_does_not_hold_text():
+    cache = ResumeTextCache(cache_dir=None, memory_entries=2)
+    for i in range(5):
+        cache.put(f'https://example.com/{i}.pdf', f'hash-{i}', f'text {i}')
+    assert len(cache._texts) == 2
+    assert all(entry.text is None for entry in cache._urls.values())
+    # URLs whose text was evicted from memory are misses (no disk tier)
+    assert cache.get('https://example.com/0.pdf') is None
+    assert cache.get('https://example.com/4.pdf').text == 'text 4'
+
+
+def test_revalidating_a_memory_hit_refreshes_the_index(monkeypatch):
+    cache = ResumeTextCache(cache_dir=None, fresh_for=10)
+    cache.put('https://example.com/a.pdf', 'hash-a', 'text')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 60)
+    entry = cache.get('https://example.com/a.pdf')
+    assert not cache.is_fresh(entry)
+    cache.mark_revalidated(entry)
+    assert cache.is_fresh(cache.get('https://example.com/a.pdf'))
+
+
+def test_disk_size_is_tracked_and_capped(tmp_path):
+    cache = ResumeTextCache(cache_dir=str(tmp_path), memory_entries=4, max_disk_bytes=1000)
+    for i in range(30):
+        cache.put(f'https://example.com/{i}.pdf', f'hash-{i}', 'x' * 100)
+        cache.put(f'https://mirror.example.com/{i}.pdf', f'hash-{i}', 'x' * 100)  # same bytes
+        assert cache._disk_bytes == disk_bytes(cache) <= 1000
+    assert cache.get('https://example.com/29.pdf').text == 'x' * 100
+    cache.close()
+
+    reopened = ResumeTextCache(cache_dir=str(tmp_path), max_disk_bytes=1000)
+    assert reopened._disk_bytes == disk_bytes(reopened)
+    assert reopened.get('https://mirror.example.com/29.pdf').text == 'x' * 100
+    reopened.close()
+
+
+def test_expired_disk_rows_are_removed(tmp_path, monkeypatch):
+    cache = ResumeTextCache(cache_dir=str(tmp_path), max_age=100)
+    cache.put('https://example.com/old.pdf', 'hash-old', 'old text')
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 101)
+    cache.put('https://example.com/new.pdf', 'hash-new', 'new text')
+    assert cache._disk_bytes == disk_bytes(cache) == len('new text')
+    assert cache.get('https://example.com/old.pdf') is None
+    cache.close()
@@ -0,0 +1,38 @@
+import asyncio
+
+import httpx
+
+from resume_fetcher import ResumeFetcher
+
+
+def test_busy_host_does_not_starve_other_hosts():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.host == 'slow.example.com':
+                await release.wait()
+            return httpx.Response(200, content=b'%PDF-1.4 ' + request.url.host.encode())
+
+        fetcher = ResumeFetcher(max_concurrency=3, max_per_host=2, retries=0)
+        await fetcher.start()
+        await fetcher._client.aclose()
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            slow = [asyncio.create_task(fetcher.fetch(f'https://slow.example.com/{i}.pdf'))
+                    for i in range(6)]
+            await asyncio.sleep(0.05)
+            # Two slow downloads run; the other four wait on the host, not on global slots
+            with await asyncio.wait_for(fetcher.fetch('https://fast.example.com/a.pdf'), 1) as result:
+                assert result.content == b'%PDF-1.4 fast.example.com'
+            assert set(fetcher._host_slots) == {'slow.example.com'}
+
+            release.set()
+            for result in await asyncio.gather(*slow):
+                result.close()
+            assert fetcher._host_slots == {}
+        finally:
+            release.set()
+            await fetcher.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+
+from benchmarks import fixtures
+from section_scanner import DEFAULT_SCANNER
+
+
+# The per-section regexes SectionScanner replaced, first pattern of each
+# (the second one can only match where the first already does)
+LEGACY_PATTERNS = {
+    'skills': r'skills?[\s:]*(.{0,500}?)(?:experience|education|projects|$)',
+    'experience': r'(?:work\s+)?experience[\s:]*(.{0,1000}?)(?:education|skills|projects|$)',
+    'education': r'education[\s:]*(.{0,500}?)(?:experience|skills|projects|$)',
+}
+
+
+def legacy_section(text, name):
+    match = re.search(LEGACY_PATTERNS[name], text.lower(), re.IGNORECASE | re.DOTALL)
+    return match.group(1).strip() if match else ''
+
+
+RESUMES = [
+    "Skills: Python, SQL\nExperience: Backend developer at Acme\nEducation: BSc Computer Science",
+    "EDUCATION\nMSc Data Science\n\nEXPERIENCE\nData analyst, 3 years\n\nSKILLS\npandas numpy\n",
+    "Summary\nEngineer.\nTechnical Skills: Go, Rust\nProjects: compiler\nProfessional Experience: SRE",
+    "Experience: built services\nSkills: docker\nExperience: led a team\nEducation: MBA",
+    "No headings here at all",
+    "",
+] + [fixtures.resume_text(words, seed=seed) for words in (40, 400, 2000) for seed in range(5)]
+
+
+@pytest.mark.parametrize('text', RESUMES)
+def test_matches_legacy_regexes(text):
+    sections = DEFAULT_SCANNER.scan(text)
+    for name in LEGACY_PATTERNS:
+        assert sections[name] == legacy_section(text, name), name
+    assert sections['full_text'] == text
+
+
+@pytest.mark.parametrize('text', [
+    "Experience: Senior developer skilled in Python and upskilling juniors\nEducation: BSc",
+    "Education: BSc, reskilling programme in cloud\nExperience: Developer at Acme",
+    "Experience: team lead for skillful engineers",
+])
+def test_header_words_inside_other_words_do_not_end_sections(text):
+    sections = DEFAULT_SCANNER.scan(text)
+    for name in ('experience', 'education'):
+        assert sections[name] == legacy_section(text, name), name
+    assert 'skill' in sections['experience'] + sections['education']
+
+
+def test_in_word_matches_do_not_start_sections():
+    assert DEFAULT_SCANNER.scan("Experience: skilled developer")['skills'] == ''
+
+
+def test_multi_word_header_ends_section_at_its_first_word():
+    # The regexes ended education at "experience", keeping "work" in its body
+    text = "Education: MSc\nWork Experience: analyst"
+    assert DEFAULT_SCANNER.scan(text)['education'] == 'msc'
+    assert legacy_section(text, 'education') == 'msc\nwork'
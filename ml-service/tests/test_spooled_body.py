@@ -0,0 +1,43 @@
+import asyncio
+import os
+
+from benchmarks import fixtures
+from pdf_extractor import PDFTextExtractor
+from pdf_parse_pool import PDFParsePool, _parse_pdf
+from spooled_body import SpooledBody
+
+
+def spooled_pdf(tmp_path):
+    """A multi-page PDF written in 4 KiB chunks, spooled after the first 8 KiB"""
+    content = fixtures.resume_pdf(pages=20, words_per_page=200)
+    chunk_size = 4096
+    assert len(content) % chunk_size not in (0, chunk_size)  # last chunk is a short one
+    body = SpooledBody(spool_bytes=8192, spool_dir=str(tmp_path))
+    for start in range(0, len(content), chunk_size):
+        body.write(content[start:start + chunk_size])
+    return content, body
+
+
+def test_finish_flushes_spooled_file(tmp_path):
+    content, body = spooled_pdf(tmp_path)
+    with body:
+        assert not body.in_memory
+        body.finish()
+        assert os.path.getsize(body.path) == len(content)
+        result = _parse_pdf(body.path, timeout=0)
+        assert result.text
+        assert result.pages_read == 20
+
+
+def test_parse_pool_reads_whole_spooled_body(tmp_path):
+    _, body = spooled_pdf(tmp_path)
+    pool = PDFParsePool(workers=1)
+    pool.start()
+    try:
+        extractor = PDFTextExtractor(parse_pool=pool)
+        with body:
+            result = asyncio.run(extractor.extract_from_body_async(body))
+    finally:
+        pool.shutdown()
+    assert result.text
+    assert not result.truncated
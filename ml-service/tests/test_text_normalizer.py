@@ -0,0 +1,57 @@
+import random
+import re
+
+import pytest
+
+from pdf_extractor import PDFTextExtractor
+from text_normalizer import RESUME_TEXT, WORD_TEXT
+
+
+# The re.sub chains the normalizers replaced
+def legacy_clean_text(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\@\-\+\#\(\)]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_word_text(text):
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def legacy_tokens(text):
+    return re.findall(r"(?u)\b\w\w+\b", text.lower())
+
+
+CASES = [
+    "",
+    "   ",
+    "plain words",
+    "Senior Python/Go developer (5+ yrs) — C#, C++, node.js; e-mail: a.b@c.io!",
+    "Tabs\tand\nnew\r\nlines\x0b\x0c\x1c\x1d\x1e\x1f\x85 and nbsp em line　ideo",
+    "Zero​width﻿bom and soft­hyphen",
+    "Résumé naïve café ÉCOLE Straße İstanbul ǅungla ﬁnance",
+    "ΟΔΥΣΣΕΥΣ ΣΟΦΙΑ Σ σ ς",
+    "数据科学家 データ 데이터 مهندس עברית",
+    "Digits ½ ² ٣ ①, under_score __init__, emoji 🚀👩‍💻 and ™®©",
+    "Bullets • ▪ ◦ – — ‘quotes’ “double” «guillemets» ‹›",
+    "***Skills***: ---- ++++ #### (((a))) ....",
+]
+
+
+def fuzz_cases(n=200, seed=0):
+    rng = random.Random(seed)
+    alphabet = (
+        "abcXYZ019_ .,@-+#()!?/\\:;'\"[]{}<>*&%$^~`|=\t\n\r\x0b\x0c\x1c\x85  　"
+        "éÉßİıΣσςǅ½²٣①数🚀​﻿­́"
+    )
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randrange(60))) for _ in range(n)]
+
+
+@pytest.mark.parametrize('text', CASES + fuzz_cases())
+def test_matches_legacy_regexes(text):
+    assert RESUME_TEXT.normalize(text) == legacy_clean_text(text)
+    assert PDFTextExtractor.clean_text(text) == legacy_clean_text(text)
+    assert WORD_TEXT.normalize(text) == legacy_word_text(text)
+    assert WORD_TEXT.tokens(text) == legacy_tokens(text)
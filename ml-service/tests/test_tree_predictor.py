@@ -0,0 +1,101 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+from scipy import sparse
+
+from conftest import MODEL_PATH
+from tree_predictor import TreeEnsemblePredictor
+
+
+def training_data(seed=0, n=600, n_features=12):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    X[rng.random(X.shape) < 0.15] = np.nan
+    X[rng.random(X.shape) < 0.15] = 0.0
+    y = np.nan_to_num(X[:, 0]) * 2 + np.nan_to_num(X[:, 1]) ** 2 + rng.normal(scale=0.1, size=n)
+    return X, y
+
+
+def holdout_data(seed=1, n=200, n_features=12):
+    X, _ = training_data(seed, n, n_features)
+    return X
+
+
+def train(tmp_path, params, X, y, **dataset_args):
+    booster = lgb.train(
+        {'verbose': -1, 'num_leaves': 15, 'min_data_in_leaf': 5, **params},
+        lgb.Dataset(X, y, **dataset_args),
+        num_boost_round=20
+    )
+    path = str(tmp_path / 'model.txt')
+    booster.save_model(path)
+    return booster, path
+
+
+MODELS = {
+    'regression': ({'objective': 'regression'}, {}),
+    'binary': ({'objective': 'binary'}, {}),
+    'zero as missing': ({'objective': 'regression', 'zero_as_missing': True}, {}),
+    'no missing handling': ({'objective': 'regression', 'use_missing': False}, {}),
+    'poisson': ({'objective': 'poisson'}, {}),
+    'lambdarank': ({'objective': 'lambdarank'}, {'group': [100] * 6}),
+    'random forest': ({'objective': 'regression', 'boosting': 'rf',
+                       'bagging_fraction': 0.8, 'bagging_freq': 1}, {}),
+}
+
+
+@pytest.mark.parametrize('name', list(MODELS))
+def test_matches_booster(tmp_path, name):
+    params, dataset_args = MODELS[name]
+    X, y = training_data()
+    if params['objective'] == 'binary':
+        y = (y > np.median(y)).astype(float)
+    elif params['objective'] in ('poisson', 'lambdarank'):
+        y = np.clip(np.round(y - y.min()), 0, 30 if params['objective'] == 'poisson' else 4)
+    booster, path = train(tmp_path, params, X, y, **dataset_args)
+
+    predictor = TreeEnsemblePredictor(path)
+    X_test = holdout_data()
+    np.testing.assert_allclose(predictor.predict(X_test), booster.predict(X_test), rtol=1e-9, atol=1e-12)
+
+    # Without NaNs the fast path (no missing-value rules) is taken
+    dense = np.nan_to_num(X_test)
+    np.testing.assert_allclose(predictor.predict(dense), booster.predict(dense), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(predictor.predict(sparse.csr_matrix(dense)), booster.predict(dense),
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_shipped_model_and_saved_arrays(tmp_path):
+    booster = lgb.Booster(model_file=MODEL_PATH)
+    predictor = TreeEnsemblePredictor(MODEL_PATH)
+    rng = np.random.default_rng(2)
+    X = sparse.random(50, predictor.num_features, density=0.05, random_state=3).toarray()
+    X[rng.integers(0, 50, 5), rng.integers(0, predictor.num_features, 5)] = np.nan
+    X = sparse.csr_matrix(X)
+
+    expected = booster.predict(X.toarray())
+    np.testing.assert_allclose(predictor.predict(X), expected, rtol=1e-9)
+
+    predictor.save(str(tmp_path / 'trees.npz'))
+    np.testing.assert_allclose(TreeEnsemblePredictor.load(str(tmp_path / 'trees.npz')).predict(X),
+                               expected, rtol=1e-9)
+    predictor.save_arrays(str(tmp_path))
+    np.testing.assert_allclose(TreeEnsemblePredictor.load_arrays(str(tmp_path), mmap_mode='r').predict(X),
+                               expected, rtol=1e-9)
+
+
+def test_multiclass_is_not_supported(tmp_path):
+    X, y = training_data()
+    _, path = train(tmp_path, {'objective': 'multiclass', 'num_class': 3}, X, np.digitize(y, [-1, 1]))
+    with pytest.raises(NotImplementedError):
+        TreeEnsemblePredictor(path)
+
+
+def test_categorical_splits_are_not_supported(tmp_path):
+    rng = np.random.default_rng(4)
+    X = rng.integers(0, 8, size=(600, 3)).astype(float)
+    y = np.where(np.isin(X[:, 0], [1, 5, 6]), 3.0, 0.0) + rng.normal(scale=0.1, size=600)
+    _, path = train(tmp_path, {'objective': 'regression', 'min_data_per_group': 5, 'cat_smooth': 1},
+                    X, y, categorical_feature=[0])
+    with pytest.raises(NotImplementedError):
+        TreeEnsemblePredictor(path)
@@ -0,0 +1,93 @@
+class _CharTable(dict):
+    """
+    str.translate table filled in lazily: each code point is classified the
+    first time it is seen, after which translate looks it up in C
+    """
+
+    # Bound on cached code points, so text cycling through all of Unicode
+    # cannot grow the table without limit
+    MAX_SIZE = 1 << 16
+
+    def __init__(self, keep, lowercase):
+        super().__init__()
+        self.keep = frozenset(keep)
+        self.lowercase = lowercase
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if self.lowercase:
+            # Full per-character case mapping; one character may lower to
+            # several, and those are filtered like the rest of the text
+            mapped = ''.join(c if self._kept(c) else ' ' for c in char.lower())
+        else:
+            mapped = char if self._kept(char) else ' '
+        value = codepoint if mapped == char else mapped
+        if len(self) < self.MAX_SIZE:
+            self[codepoint] = value
+        return value
+
+    def _kept(self, char):
+        # Same classes as the regexes it replaces: \w, \s and the extra characters
+        return char.isalnum() or char == '_' or char.isspace() or char in self.keep
+
+
+class TextNormalizer:
+    """
+    Single-pass text cleanup shared by the PDF extractor and the ranker.
+
+    One str.translate call optionally lowercases the text and turns every
+    character that is not a word character, whitespace or one of `keep`
+    into a space; str.split then collapses the whitespace. Both run in C
+    over the text once, replacing chains of re.sub passes and the
+    intermediate strings each of them created.
+    """
+
+    # Greek capital sigma lowers to final or medial sigma depending on its
+    # neighbours, which a per-character table cannot see
+    _CONTEXTUAL_LOWER = 'Σ'
+
+    def __init__(self, keep='', lowercase=False):
+        """
+        Args:
+            keep: Characters kept besides word characters and whitespace
+            lowercase: Also lowercase the text (like str.lower)
+        """
+        self.keep = keep
+        self.lowercase = lowercase
+        self._table = _CharTable(keep, lowercase)
+        self._filter_table = _CharTable(keep, False) if lowercase else self._table
+
+    def _translate(self, text):
+        if self.lowercase and self._CONTEXTUAL_LOWER in text:
+            return text.lower().translate(self._filter_table)
+        return text.translate(self._table)
+
+    def normalize(self, text):
+        """Cleaned text, words separated by single spaces"""
+        if not text:
+            return ""
+        return ' '.join(self._translate(text).split())
+
+    def tokens(self, text, min_length=2):
+        """
+        Words of the normalized text, without building the joined string.
+
+        With lowercase=True and no extra `keep` characters these are the
+        tokens sklearn's default token_pattern (?u)\\b\\w\\w+\\b finds in
+        text.lower(), so a vectorizer can count them without scanning the
+        text again.
+        """
+        if not text:
+            return []
+        words = self._translate(text).split()
+        if min_length <= 1:
+            return words
+        return [word for word in words if len(word) >= min_length]
+
+
+# PDFTextExtractor.clean_text: keeps the punctuation that carries meaning
+# in resumes (emails, C++, C#, dates, phone numbers)
+RESUME_TEXT = TextNormalizer(keep='.,@-+#()')
+
+# Ranker / vectorizer view of a text: lowercase words only
+WORD_TEXT = TextNormalizer(lowercase=True)
@@ -0,0 +1,245 @@
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+# LightGBM decision_type bit layout (see LightGBM include/LightGBM/tree.h)
+CATEGORICAL_MASK = 1
+DEFAULT_LEFT_MASK = 2
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+ZERO_THRESHOLD = 1e-35
+
+
+def _parse_values(value, dtype):
+    return np.array(value.split(), dtype=dtype) if value else np.array([], dtype=dtype)
+
+
+class TreeEnsemblePredictor:
+    """
+    LightGBM text model compiled into flat NumPy arrays.
+
+    All trees are stored in shared node arrays (feature, threshold, children,
+    default direction, missing type) and evaluated together: every step moves
+    each (sample, tree) pair one level down, so a batch costs max_depth
+    vectorized steps instead of one call into the LightGBM C API. Meant for
+    the small batches most jobs have; supports numerical splits only.
+    """
+
+    # Node/leaf arrays persisted by save() and restored by load()
+    ARRAYS = ('feature', 'threshold', 'default_left', 'missing_type',
+              'left_child', 'right_child', 'leaf_value', 'roots')
+
+    def __init__(self, model_path):
+        """
+        Args:
+            model_path: LightGBM model saved in text format
+
+        Raises:
+            NotImplementedError: for models this engine cannot evaluate
+                (multiclass, categorical splits, linear trees, unknown objective)
+        """
+        with open(model_path, 'r') as f:
+            header, trees = self._read_model(f)
+
+        if int(header.get('num_class', 1)) != 1:
+            raise NotImplementedError("multiclass models are not supported")
+
+        self.num_features = int(header['max_feature_idx']) + 1
+        self.average_output = 'average_output' in header
+        self.objective = header.get('objective', 'regression')
+        self._set_objective(self.objective)
+        self._compile(trees)
+
+    def save(self, path):
+        """Write the compiled arrays to an .npz file (see load)"""
+        np.savez(
+            path,
+            objective=np.array(self.objective),
+            meta=np.array([self.num_features, self.max_depth, int(self.average_output)]),
+            **{name: getattr(self, name) for name in self.ARRAYS}
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Rebuild a predictor from save() output without parsing the model text"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls._from_arrays({name: data[name] for name in cls.ARRAYS},
+                                    data['meta'], data['objective'])
+
+    def save_arrays(self, directory):
+        """Write each compiled array to its own .npy file so it can be memory-mapped"""
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, 'meta.npy'),
+                np.array([self.num_features, self.max_depth, int(self.average_output)]))
+        np.save(os.path.join(directory, 'objective.npy'), np.array(self.objective))
+
+    @classmethod
+    def load_arrays(cls, directory, mmap_mode=None):
+        """
+        Rebuild a predictor from save_arrays() output. With mmap_mode='r' the
+        node arrays are read-only views of the files, shared between processes.
+        """
+        def load(name, mode=None):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+
+        return cls._from_arrays({name: load(name, mmap_mode) for name in cls.ARRAYS},
+                                load('meta'), load('objective'))
+
+    @classmethod
+    def _from_arrays(cls, arrays, meta, objective):
+        predictor = cls.__new__(cls)
+        for name, array in arrays.items():
+            setattr(predictor, name, array)
+        predictor.num_features, predictor.max_depth, average_output = meta.tolist()
+        predictor.objective = str(objective)
+        predictor.average_output = bool(average_output)
+        predictor.num_trees = len(predictor.roots)
+        predictor._needs_missing_rules = bool(np.any(predictor.missing_type != MISSING_NONE))
+        predictor._set_objective(predictor.objective)
+        return predictor
+
+    @staticmethod
+    def _read_model(f):
+        header, trees, current = {}, [], None
+        for line in f:
+            line = line.strip()
+            if line.startswith('Tree='):
+                current = {}
+                trees.append(current)
+                continue
+            if line == 'end of trees':
+                break
+            if '=' in line:
+                key, value = line.split('=', 1)
+                (current if current is not None else header)[key] = value
+            elif line == 'average_output':
+                header['average_output'] = ''
+        return header, trees
+
+    def _set_objective(self, objective):
+        name, *params = objective.split()
+        if 'sqrt' in params:
+            raise NotImplementedError("reg_sqrt models are not supported")
+        params = dict(param.split(':', 1) for param in params if ':' in param)
+        if name in ('binary', 'cross_entropy', 'xentropy'):
+            sigmoid = float(params.get('sigmoid', 1.0))
+            self._transform = lambda raw: 1.0 / (1.0 + np.exp(-sigmoid * raw))
+        elif name in ('regression', 'regression_l1', 'huber', 'fair', 'quantile', 'mape',
+                      'lambdarank', 'rank_xendcg'):
+            self._transform = None
+        elif name in ('poisson', 'gamma', 'tweedie'):
+            self._transform = np.exp
+        else:
+            raise NotImplementedError(f"objective '{name}' is not supported")
+
+    def _compile(self, trees):
+        features, thresholds, defaults_left, missing_types = [], [], [], []
+        lefts, rights, leaf_values, roots = [], [], [], []
+        node_offset = leaf_offset = 0
+        max_depth = 0
+
+        for tree in trees:
+            if tree.get('is_linear', '0') != '0':
+                raise NotImplementedError("linear trees are not supported")
+
+            values = _parse_values(tree['leaf_value'], np.float64)
+            num_leaves = int(tree['num_leaves'])
+            if num_leaves == 1:
+                roots.append(-(leaf_offset + 1))
+                leaf_values.append(values)
+                leaf_offset += 1
+                continue
+
+            decision = _parse_values(tree['decision_type'], np.int64)
+            if np.any(decision & CATEGORICAL_MASK):
+                raise NotImplementedError("categorical splits are not supported")
+
+            left = _parse_values(tree['left_child'], np.int64)
+            right = _parse_values(tree['right_child'], np.int64)
+
+            # Internal children become global node ids, leaves -(global leaf id) - 1
+            lefts.append(np.where(left >= 0, left + node_offset, left - leaf_offset))
+            rights.append(np.where(right >= 0, right + node_offset, right - leaf_offset))
+            features.append(_parse_values(tree['split_feature'], np.int64))
+            thresholds.append(_parse_values(tree['threshold'], np.float64))
+            defaults_left.append((decision & DEFAULT_LEFT_MASK) != 0)
+            missing_types.append((decision >> 2) & 3)
+            leaf_values.append(values)
+            roots.append(node_offset)
+            max_depth = max(max_depth, self._depth(left, right))
+
+            node_offset += num_leaves - 1
+            leaf_offset += num_leaves
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+
+        self.feature = concat(features, np.int64)
+        self.threshold = concat(thresholds, np.float64)
+        self.default_left = concat(defaults_left, bool)
+        self.missing_type = concat(missing_types, np.int64)
+        self.left_child = concat(lefts, np.int64)
+        self.right_child = concat(rights, np.int64)
+        self.leaf_value = concat(leaf_values, np.float64)
+        self.roots = np.array(roots, dtype=np.int64)
+        self.max_depth = max_depth
+        self.num_trees = len(roots)
+        self._needs_missing_rules = bool(np.any(self.missing_type != MISSING_NONE))
+
+    @staticmethod
+    def _depth(left, right):
+        depth, frontier = 0, [0]
+        while frontier:
+            depth += 1
+            frontier = [c for n in frontier for c in (left[n], right[n]) if c >= 0]
+        return depth
+
+    def predict_raw(self, X):
+        """Raw (untransformed) scores for a dense or sparse feature matrix"""
+        if sparse.issparse(X):
+            X = X.toarray()
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] < self.num_features:
+            X = np.pad(X, ((0, 0), (0, self.num_features - X.shape[1])))
+
+        n_samples = X.shape[0]
+        rows = np.repeat(np.arange(n_samples), self.num_trees)
+        node = np.tile(self.roots, n_samples)
+        missing_rules = self._needs_missing_rules or np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            active = np.flatnonzero(node >= 0)
+            if active.size == 0:
+                break
+            current = node[active]
+            fval = X[rows[active], self.feature[current]]
+
+            if not missing_rules:
+                go_left = fval <= self.threshold[current]
+                node[active] = np.where(go_left, self.left_child[current], self.right_child[current])
+                continue
+
+            missing = self.missing_type[current]
+
+            # Same rules as LightGBM's NumericalDecision
+            is_nan = np.isnan(fval)
+            fval = np.where(is_nan & (missing != MISSING_NAN), 0.0, fval)
+            use_default = ((missing == MISSING_ZERO) & (np.abs(fval) <= ZERO_THRESHOLD)) | \
+                          ((missing == MISSING_NAN) & is_nan)
+            go_left = np.where(use_default, self.default_left[current], fval <= self.threshold[current])
+
+            node[active] = np.where(go_left, self.left_child[current], self.right_child[current])
+
+        raw = self.leaf_value[-node - 1].reshape(n_samples, self.num_trees).sum(axis=1)
+        if self.average_output and self.num_trees:
+            raw /= self.num_trees
+        return raw
+
+    def predict(self, X):
+        """Scores matching lgb.Booster.predict(X)"""
+        raw = self.predict_raw(X)
+        return self._transform(raw) if self._transform is not None else raw
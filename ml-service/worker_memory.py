@@ -0,0 +1,34 @@
+import os
+
+
+def process_memory():
+    """
+    Memory of the current worker process, in bytes, from /proc/self/smaps_rollup.
+
+    - rss: resident pages, including those shared with other processes
+    - pss: rss with every shared page split evenly between the processes mapping it
+    - uss: pages only this process has (what killing it would free)
+    - shared: resident pages also mapped by other processes (e.g. the
+      memory-mapped vectorizer and trees of SHARED_MODEL_DIR)
+
+    Returns None where smaps_rollup is unavailable (non-Linux, old kernels).
+    """
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 3 and parts[2] == 'kB':
+            fields[parts[0].rstrip(':')] = int(parts[1]) * 1024
+
+    return {
+        "pid": os.getpid(),
+        "rss": fields.get('Rss', 0),
+        "pss": fields.get('Pss', 0),
+        "uss": fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        "shared": fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }